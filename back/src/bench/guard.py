@@ -0,0 +1,61 @@
+"""
+Cost of one guarded write on the grid, with the lock of GoLLib and with the former stack walk
+
+Usage: python3 guard.py [writes] [depth]
+"""
+
+
+import sys
+import inspect
+import typing
+from os import path
+from time import perf_counter
+
+sys.path.insert(0, path.join(path.dirname(path.abspath(__file__)), "..", "data", "original_team"))
+
+import numpy
+import GoLLib
+
+
+def stackGuard() -> None:
+    """
+    The guard used before the lock: walk the whole stack looking for the player module
+    """
+    stack = inspect.stack()
+    for frame in stack:
+        module = inspect.getmodule(frame[0])
+        if module and module.__name__.startswith(GoLLib.RESTRICTED_LIB):
+            raise AttributeError(f"Modification not allowed inside {module.__name__}")
+
+
+def timeCalls(call: typing.Callable[[], typing.Any], calls: int, depth: int) -> float:
+    """
+    Average time of one call, in seconds, made under `depth` more frames since the stack walk depends on it
+    """
+    if depth > 0:
+        return timeCalls(call, calls, depth - 1)
+    start: float = perf_counter()
+    for _ in range(calls):
+        call()
+    return (perf_counter() - start) / calls
+
+
+def main(writes: int, depth: int) -> None:
+    """
+    Print the cost of each guard, and of a whole write on the grid with the lock
+    """
+    grid: GoLLib.Grid = GoLLib.Grid(500, 500, numpy.zeros(500 * 500, dtype=bool))
+
+    def write() -> None:
+        grid[1234] = True
+
+    lock: float = timeCalls(GoLLib.LOCK.check, writes, depth)
+    stack: float = timeCalls(stackGuard, max(1, writes // 100), depth)
+    total: float = timeCalls(write, writes, depth)
+    print(f"lock check: {lock * 1e9:.0f} ns per write")
+    print(f"stack walk at depth {depth}: {stack * 1e9:.0f} ns per write, x{stack / lock:.0f}")
+    print(f"grid write with the lock: {total * 1e9:.0f} ns, {total * 1e9 + (stack - lock) * 1e9:.0f} ns with the stack walk")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000, int(sys.argv[2]) if len(sys.argv) > 2 else 5)
@@ -0,0 +1,55 @@
+"""
+Scaling benchmark of the parallel engine on synthetic stages
+
+Usage: python3 parallel.py [max workers] [sizes...]
+"""
+
+
+import sys
+import typing
+from os import path, cpu_count
+from time import perf_counter
+
+sys.path.insert(0, path.join(path.dirname(path.abspath(__file__)), "..", "data", "original_team"))
+
+import numpy
+import GoLEngine
+
+
+def timeSteps(step: typing.Callable[[], None], generations: int) -> float:
+    """
+    Average time of one step, in seconds, after one warm-up step
+    """
+    step()
+    start: float = perf_counter()
+    for _ in range(generations):
+        step()
+    return (perf_counter() - start) / generations
+
+
+def main(max_workers: int, sizes: list[int]) -> None:
+    """
+    Print the time per generation for 1 to `max_workers` workers, for each size of square stage
+    """
+    for size in sizes:
+        cells: numpy.ndarray = numpy.random.default_rng(size).random((size, size)) < 0.3
+        generations: int = max(3, 20_000_000 // (size * size))
+
+        def stepNumpy() -> None:
+            nonlocal cells
+            cells = GoLEngine.nextGeneration(cells, GoLEngine.countNeighbors(cells))
+
+        base: float = timeSteps(stepNumpy, generations)
+        print(f"{size}x{size} numpy: {base * 1000:.1f} ms/gen")
+
+        for workers in range(1, max_workers + 1):
+            parallel: GoLEngine.ParallelCells = GoLEngine.ParallelCells(cells, workers)
+            try:
+                res: float = timeSteps(parallel.step, generations)
+            finally:
+                parallel.close()
+            print(f"{size}x{size} parallel {workers}: {res * 1000:.1f} ms/gen, x{base / res:.2f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else (cpu_count() or 1), list(map(int, sys.argv[2:])) or [2000, 8000])
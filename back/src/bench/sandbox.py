@@ -0,0 +1,109 @@
+"""
+Latency of a submission with a new interpreter per submission (and a new container when docker is installed),
+against a warm worker of the sandbox pool
+
+Without stages, only the startup is measured: the interpreter, the imports of the game and of the prelude
+
+Usage: python3 sandbox.py [runs] [stage ...]
+"""
+
+
+import sys
+import os
+import shutil
+import tempfile
+import statistics
+import subprocess
+import typing
+from os import path
+from time import perf_counter, sleep
+
+sys.path.insert(0, path.join(path.dirname(path.abspath(__file__)), "..", "docker-run"))
+
+import runner
+import pool
+
+
+ORIGINAL_TEAM: str = path.join(path.dirname(path.abspath(__file__)), "..", "data", "original_team")
+TEAM_ID: int = 0
+
+
+def makeRoot(root: str) -> str:
+    """
+    A data directory with the player of the original team submitted, returns the directory of the team
+    """
+    os.chmod(root, 0o755)
+    os.symlink(path.abspath(ORIGINAL_TEAM), f"{root}/original_team")
+    for directory in ("tmp", "teams", "logs"):
+        os.makedirs(f"{root}/{directory}", mode=0o755)
+    shutil.copy(f"{ORIGINAL_TEAM}/ModulePlayer.py", f"{root}/tmp/{TEAM_ID}.py")
+    runner.initEnvironement(TEAM_ID, root)
+    team: str = f"{root}/teams/{TEAM_ID}"
+    for directory, _, files in os.walk(team):
+        os.chmod(directory, 0o777)
+        for file in files:
+            os.chmod(path.join(directory, file), 0o666)
+    return team
+
+
+def timeRuns(call: typing.Callable[[], typing.Any], runs: int) -> list[float]:
+    """
+    The time of each call, in seconds
+    """
+    times: list[float] = []
+    for _ in range(runs):
+        start: float = perf_counter()
+        call()
+        times.append(perf_counter() - start)
+    return times
+
+
+def report(name: str, times: list[float], base: list[float] | None = None) -> None:
+    """
+    Print the median and the best time of the calls
+    """
+    ratio: str = f", x{statistics.median(base) / statistics.median(times):.1f}" if base else ""
+    print(f"{name}: median {statistics.median(times) * 1000:.0f} ms, best {min(times) * 1000:.0f} ms{ratio}")
+
+
+def main(runs: int, stages: list[str]) -> None:
+    """
+    Print the latency of each path for the stages
+    """
+    with tempfile.TemporaryDirectory() as root:
+        team: str = makeRoot(root)
+
+        def runCold() -> None:
+            subprocess.run([sys.executable, "ModuleGame.py", *stages], cwd=team, stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT, check=True)
+
+        cold: list[float] = timeRuns(runCold, runs)
+        report("new interpreter", cold)
+
+        if shutil.which("docker"):
+            report("new container", timeRuns(lambda: runner.callInsideDocker(TEAM_ID, root, tuple(stages)), runs), cold)
+        else:
+            print("new container: docker is not installed")
+
+        address: str = f"{root}/pool.sock"
+        start: float = perf_counter()
+        server: subprocess.Popen = subprocess.Popen([sys.executable, path.join(path.dirname(pool.__file__), "pool.py"), "serve", address])
+        try:
+            while not path.exists(address):
+                if server.poll() is not None:
+                    raise RuntimeError("The pool did not start")
+                sleep(0.01)
+            print(f"pool warm-up: {(perf_counter() - start) * 1000:.0f} ms, once")
+
+            def runWarm() -> None:
+                res: pool.Result = pool.play(address, team, stages)
+                if res.code:
+                    raise RuntimeError(res.output)
+
+            report("warm pool", timeRuns(runWarm, runs), cold)
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10, sys.argv[2:])
@@ -0,0 +1,689 @@
+"""
+The Engine file of the game
+"""
+
+
+import collections
+import time
+import multiprocessing
+import multiprocessing.connection
+import multiprocessing.shared_memory
+import typing
+import weakref
+import numpy
+
+
+def countNeighbors(cells: numpy.ndarray) -> numpy.ndarray:
+    """
+    Count the number of neighbor that are alive for every cell
+
+    Args:
+        cells (numpy.ndarray): the (height, width) boolean grid
+
+    Returns:
+        numpy.ndarray: the (height, width) neighbor counts, outside of the grid is dead
+    """
+    padded: numpy.ndarray = numpy.pad(cells, 1).astype(numpy.int8)
+    res: numpy.ndarray = padded[:-2, :-2] + padded[:-2, 1:-1]
+    res += padded[:-2, 2:]
+    res += padded[1:-1, :-2]
+    res += padded[1:-1, 2:]
+    res += padded[2:, :-2]
+    res += padded[2:, 1:-1]
+    res += padded[2:, 2:]
+    return res
+
+
+def scatterNeighbors(neighbor: numpy.ndarray, flat: numpy.ndarray, change: numpy.ndarray) -> None:
+    """
+    Add `change` to the neighbor counts around some cells, only the neighbors of these cells are touched
+
+    Args:
+        neighbor (numpy.ndarray): the (height, width) neighbor counts, updated in place
+        flat (numpy.ndarray): the distinct cells, as `w + h * width`
+        change (numpy.ndarray): +1 for the cells that were born, -1 for the ones that died
+    """
+    height, width = neighbor.shape
+    h: numpy.ndarray = flat // width
+    w: numpy.ndarray = flat % width
+    change = change.astype(neighbor.dtype)
+    for dh, dw in ((-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)):
+        inside: numpy.ndarray = (h + dh >= 0) & (h + dh < height) & (w + dw >= 0) & (w + dw < width)
+        # Two cells of `flat` can share a neighbor, numpy.add.at adds both
+        numpy.add.at(neighbor, (h[inside] + dh, w[inside] + dw), change[inside])
+
+
+def oddCells(played: numpy.ndarray) -> numpy.ndarray:
+    """
+    The distinct cells of `played` that appear an odd number of times, in order: the cells swapped by these moves
+    """
+    flat, counts = numpy.unique(played, return_counts=True)
+    return flat[(counts & 1) == 1]
+
+
+def nextGeneration(cells: numpy.ndarray, neighbor: numpy.ndarray) -> numpy.ndarray:
+    """
+    Apply the rule of the game to the whole grid at once
+
+    Args:
+        cells (numpy.ndarray): the (height, width) boolean grid
+        neighbor (numpy.ndarray): the neighbor counts of `cells`
+
+    Returns:
+        numpy.ndarray: the next generation of `cells`
+    """
+    return (neighbor == 3) | (cells & (neighbor == 2))
+
+
+def countPattern(board: "numpy.ndarray | PackedCells", pattern: numpy.ndarray) -> int:
+    """
+    Count the windows of `board` that are exactly `pattern`
+
+    Args:
+        board (numpy.ndarray | PackedCells): the (height, width) boolean board, or the board already packed
+        pattern (numpy.ndarray): the (rows, cols) boolean pattern
+
+    Returns:
+        int: the number of positions where the pattern fits entirely inside the board and matches every cell
+
+    The board is packed 64 cells per word, the bit `w` of the row `h` of `match` is the window starting at (h, w)
+    """
+    rows, cols = pattern.shape
+    height: int = board.shape[0] - rows + 1
+    width: int = board.shape[1] - cols + 1
+    if height <= 0 or width <= 0:
+        return 0
+    words: numpy.ndarray = (board if isinstance(board, PackedCells) else PackedCells(board)).words
+    match: numpy.ndarray = numpy.full((height, words.shape[1]), numpy.uint64(0xFFFFFFFFFFFFFFFF))
+    for c in range(cols):
+        shifted: numpy.ndarray = words
+        if c:
+            shifted = words >> numpy.uint64(c)
+            shifted[:, :-1] |= words[:, 1:] << numpy.uint64(64 - c)
+        inverse: numpy.ndarray = ~shifted if not pattern[:, c].all() else shifted
+        for r in range(rows):
+            match &= shifted[r:r + height] if pattern[r, c] else inverse[r:r + height]
+    match &= PackedCells(numpy.arange(words.shape[1] * 64)[None, :] < width).words
+    return int(numpy.bitwise_count(match).sum())
+
+
+class PackedCells:
+    """
+    Cells packed by row into uint64 words
+
+    Attributes:
+        shape (const tuple[int, int]): the (height, width) of the grid
+        words (numpy.ndarray): (height, ceil(width / 64)) words, column `w` is bit `w % 64` of word `w // 64`
+
+    Items are read and written with `cells[h, w]`\n
+    `numpy.asarray(cells)` unpacks them into a (height, width) boolean array
+    """
+    def __init__(self: "PackedCells", cells: numpy.ndarray) -> None:
+        cells = numpy.asarray(cells, dtype=bool)
+        self.shape: tuple[int, int] = cells.shape
+        packed: numpy.ndarray = numpy.packbits(cells, axis=1, bitorder="little")
+        padded: numpy.ndarray = numpy.zeros((cells.shape[0], -(-cells.shape[1] // 64) * 8), dtype=numpy.uint8)
+        padded[:, :packed.shape[1]] = packed
+        self.words: numpy.ndarray = padded.view("<u8").astype(numpy.uint64)
+
+    def __getitem__(self: "PackedCells", key: tuple[int, int]) -> bool:
+        h, w = key
+        return bool((int(self.words[h, w >> 6]) >> (w & 63)) & 1)
+
+    def __setitem__(self: "PackedCells", key: tuple[int, int], value: bool) -> None:
+        h, w = key
+        bit: numpy.uint64 = numpy.uint64(1 << (w & 63))
+        if value:
+            self.words[h, w >> 6] |= bit
+        else:
+            self.words[h, w >> 6] &= ~bit
+
+    def toggle(self: "PackedCells", h: numpy.ndarray, w: numpy.ndarray) -> None:
+        """Swap the distinct cells (w[i], h[i])"""
+        # Cells of the same word are swapped one after the other by numpy.bitwise_xor.at
+        numpy.bitwise_xor.at(self.words, (h, w >> 6), numpy.left_shift(numpy.uint64(1), (w & 63).astype(numpy.uint64)))
+
+    def __array__(self: "PackedCells", dtype: typing.Any = None, copy: typing.Any = None) -> numpy.ndarray:
+        cells: numpy.ndarray = numpy.unpackbits(self.words.astype("<u8").view(numpy.uint8), axis=1, count=self.shape[1], bitorder="little").astype(bool)
+        return cells if dtype is None else cells.astype(dtype)
+
+    def copy(self: "PackedCells") -> "PackedCells":
+        res: PackedCells = PackedCells.__new__(PackedCells)
+        res.shape = self.shape
+        res.words = self.words.copy()
+        return res
+
+    def step(self: "PackedCells") -> None:
+        """
+        Compute the next generation in place, 64 cells per word operation
+        """
+        x: numpy.ndarray = self.words
+        rows: numpy.ndarray = numpy.zeros((x.shape[0] + 2, x.shape[1]), dtype=numpy.uint64)
+        rows[1:-1] = x
+        west, east = shiftWest(rows), shiftEast(rows)
+
+        # Each row adds its 3 cells once, the row of the cell only its 2 sides: sides + 2 * pairs
+        sides: numpy.ndarray = west ^ east
+        pairs: numpy.ndarray = west & east
+        s: numpy.ndarray = sides ^ rows
+        c: numpy.ndarray = pairs | (rows & sides)
+        # count = ones + 2 * (carry + c_up + pairs + c_down), alive with exactly one of those 4 carries
+        ones, carry = fullAdder(s[:-2], sides[1:-1], s[2:])
+        odd, many = fullAdder(c[:-2], pairs[1:-1], c[2:])
+
+        x[...] = (odd ^ carry) & ~(many | (odd & carry)) & (ones | x)
+        if self.shape[1] % 64:
+            x[:, -1] &= numpy.uint64((1 << (self.shape[1] % 64)) - 1)
+
+
+def shiftWest(words: numpy.ndarray) -> numpy.ndarray:
+    """Move every bit one column to the east, so each cell sees its west neighbor"""
+    res: numpy.ndarray = words << numpy.uint64(1)
+    res[:, 1:] |= words[:, :-1] >> numpy.uint64(63)
+    return res
+
+
+def shiftEast(words: numpy.ndarray) -> numpy.ndarray:
+    """Move every bit one column to the west, so each cell sees its east neighbor"""
+    res: numpy.ndarray = words >> numpy.uint64(1)
+    res[:, :-1] |= words[:, 1:] << numpy.uint64(63)
+    return res
+
+
+def fullAdder(a: numpy.ndarray, b: numpy.ndarray, c: numpy.ndarray) -> tuple[numpy.ndarray, numpy.ndarray]:
+    """Add three bit planes, returns the sum and carry planes"""
+    ab: numpy.ndarray = a ^ b
+    return ab ^ c, (a & b) | (c & ab)
+
+
+class TiledCells:
+    """
+    Cells split into square tiles, a step only recomputes the active tiles
+
+    A tile is active when it or one of its 8 neighbor tiles changed on the previous step or got flipped
+
+    Attributes:
+        TILE (const int): the side of a tile
+        cells (numpy.ndarray): writable (height, width) view of the cells
+        dirty (numpy.ndarray): (tiles_h, tiles_w) tiles that changed since the last step
+    """
+    def __init__(self: "TiledCells", cells: numpy.ndarray, tile: int = 16) -> None:
+        height, width = cells.shape
+        tiles_h: int = -(-height // tile)
+        tiles_w: int = -(-width // tile)
+
+        self.TILE: int = tile
+        self.__buffer: numpy.ndarray = numpy.zeros((tiles_h * tile + 2, tiles_w * tile + 2), dtype=bool)
+        self.__buffer[1:height + 1, 1:width + 1] = cells
+        self.cells: numpy.ndarray = self.__buffer[1:height + 1, 1:width + 1]
+        self.dirty: numpy.ndarray = numpy.ones((tiles_h, tiles_w), dtype=bool)
+
+        s0, s1 = self.__buffer.strides
+        self.__windows: numpy.ndarray = numpy.lib.stride_tricks.as_strided(self.__buffer, shape=(tiles_h, tiles_w, tile + 2, tile + 2), strides=(tile * s0, tile * s1, s0, s1), writeable=False)
+        self.__tiles: numpy.ndarray = numpy.lib.stride_tricks.as_strided(self.__buffer[1:, 1:], shape=(tiles_h, tiles_w, tile, tile), strides=(tile * s0, tile * s1, s0, s1))
+        valid: numpy.ndarray = numpy.zeros((tiles_h * tile, tiles_w * tile), dtype=bool)
+        valid[:height, :width] = True
+        self.__valid: numpy.ndarray = valid.reshape((tiles_h, tile, tiles_w, tile)).swapaxes(1, 2)
+
+    def mark(self: "TiledCells", h: int | numpy.ndarray, w: int | numpy.ndarray) -> None:
+        """Mark the tile of the cell (w, h) as changed, or of every cell when given arrays"""
+        self.dirty[h // self.TILE, w // self.TILE] = True
+
+    def step(self: "TiledCells") -> int:
+        """
+        Compute the next generation in place
+
+        Returns:
+            int: the number of tiles that were recomputed
+        """
+        active: numpy.ndarray = numpy.pad(self.dirty, 1)
+        active = active[:-2, :-2] | active[:-2, 1:-1] | active[:-2, 2:] | active[1:-1, :-2] | active[1:-1, 1:-1] | active[1:-1, 2:] | active[2:, :-2] | active[2:, 1:-1] | active[2:, 2:]
+        ti, tj = numpy.nonzero(active)
+        self.dirty[...] = False
+        if not len(ti):
+            return 0
+
+        blocks: numpy.ndarray = self.__windows[ti, tj].astype(numpy.int8)
+        count: numpy.ndarray = blocks[:, :-2, :-2] + blocks[:, :-2, 1:-1]
+        count += blocks[:, :-2, 2:]
+        count += blocks[:, 1:-1, :-2]
+        count += blocks[:, 1:-1, 2:]
+        count += blocks[:, 2:, :-2]
+        count += blocks[:, 2:, 1:-1]
+        count += blocks[:, 2:, 2:]
+        center: numpy.ndarray = blocks[:, 1:-1, 1:-1].astype(bool)
+
+        new: numpy.ndarray = ((count == 3) | (center & (count == 2))) & self.__valid[ti, tj]
+        changed: numpy.ndarray = (new != center).any(axis=(1, 2))
+        self.__tiles[ti[changed], tj[changed]] = new[changed]
+        self.dirty[ti[changed], tj[changed]] = True
+        return len(ti)
+
+
+class MacroCell:
+    """
+    A hash-consed square of 2**level cells, made of four quadrants
+
+    Attributes:
+        level (const int): the side of the square is 2**level, at least 4
+        nw, ne, sw, se (const MacroCell | int): the quadrants, 8x8 leaves are ints with bit `8 * h + w`
+        next (MacroCell | int | None): the memoized center after one generation
+    """
+    __slots__ = ('level', 'nw', 'ne', 'sw', 'se', 'next')
+
+    def __init__(self: "MacroCell", level: int, nw: "MacroCell | int", ne: "MacroCell | int", sw: "MacroCell | int", se: "MacroCell | int") -> None:
+        self.level: int = level
+        self.nw: MacroCell | int = nw
+        self.ne: MacroCell | int = ne
+        self.sw: MacroCell | int = sw
+        self.se: MacroCell | int = se
+        self.next: MacroCell | int | None = None
+
+
+LEAF: int = 3
+FULL_16: int = (1 << 256) - 1
+COL_0_16: int = sum(1 << (16 * h) for h in range(16))
+COL_15_16: int = COL_0_16 << 15
+
+
+class HashLife:
+    """
+    HashLife-style simulator: identical squares are shared, and so is their next generation
+
+    Regions that did not change since an earlier call or generation are looked up instead of recomputed\n
+    When most of the grid is busy, memoization does not pay and the remaining generations use `nextGeneration`\n
+    The grid is bounded, cells outside of it are dead
+    """
+    def __init__(self: "HashLife", limit: int = 1 << 20) -> None:
+        self.__limit: int = limit
+        self.__nodes: dict[tuple[typing.Any, ...], MacroCell] = {}
+        self.__empty: dict[int, MacroCell | int] = {LEAF: 0}
+        self.__clipped: dict[tuple[typing.Any, ...], MacroCell | int] = {}
+        self.__computed: int = 0
+        self.__created: int = 0
+
+    def join(self: "HashLife", nw: MacroCell | int, ne: MacroCell | int, sw: MacroCell | int, se: MacroCell | int) -> MacroCell:
+        """Get the unique macro-cell made of the four quadrants"""
+        key: tuple[typing.Any, ...] = (nw, ne, sw, se)
+        node: MacroCell | None = self.__nodes.get(key)
+        if node is None:
+            node = MacroCell(LEAF + 1 if isinstance(nw, int) else nw.level + 1, nw, ne, sw, se)
+            self.__nodes[key] = node
+            self.__created += node.level == LEAF + 1
+        return node
+
+    def empty(self: "HashLife", level: int) -> MacroCell | int:
+        """Get the dead square of side 2**level"""
+        if level not in self.__empty:
+            sub: MacroCell | int = self.empty(level - 1)
+            self.__empty[level] = self.join(sub, sub, sub, sub)
+        return self.__empty[level]
+
+    def center(self: "HashLife", node: MacroCell) -> MacroCell | int:
+        """Get the centered square of half side"""
+        if node.level == LEAF + 1:
+            return leafCenter(node.nw, node.ne, node.sw, node.se)
+        return self.join(node.nw.se, node.ne.sw, node.sw.ne, node.se.nw)
+
+    def step(self: "HashLife", node: MacroCell) -> MacroCell | int:
+        """Get the centered square of half side after one generation"""
+        if node.next is not None:
+            return node.next
+        if node.level == LEAF + 1:
+            node.next = leafStep(node.nw, node.ne, node.sw, node.se)
+            self.__computed += 1
+            return node.next
+
+        nw, ne, sw, se = node.nw, node.ne, node.sw, node.se
+        r00 = self.step(nw)
+        r01 = self.step(self.join(nw.ne, ne.nw, nw.se, ne.sw))
+        r02 = self.step(ne)
+        r10 = self.step(self.join(nw.sw, nw.se, sw.nw, sw.ne))
+        r11 = self.step(self.join(nw.se, ne.sw, sw.ne, se.nw))
+        r12 = self.step(self.join(ne.sw, ne.se, se.nw, se.ne))
+        r20 = self.step(sw)
+        r21 = self.step(self.join(sw.ne, se.nw, sw.se, se.sw))
+        r22 = self.step(se)
+        node.next = self.join(
+            self.center(self.join(r00, r01, r10, r11)),
+            self.center(self.join(r01, r02, r11, r12)),
+            self.center(self.join(r10, r11, r20, r21)),
+            self.center(self.join(r11, r12, r21, r22))
+        )
+        return node.next
+
+    def clip(self: "HashLife", node: MacroCell | int, level: int, h: int, w: int, height: int, width: int) -> MacroCell | int:
+        """Kill the cells of the square at (w, h) that are outside of the grid"""
+        size: int = 1 << level
+        if h + size <= height and w + size <= width:
+            return node
+        if h >= height or w >= width:
+            return self.empty(level)
+        key: tuple[typing.Any, ...] = (node, h, w, height, width)
+        if key in self.__clipped:
+            return self.__clipped[key]
+
+        res: MacroCell | int
+        if level == LEAF:
+            mask: int = 0
+            for row in range(min(8, height - h)):
+                mask |= ((1 << min(8, width - w)) - 1) << (8 * row)
+            res = node & mask
+        else:
+            half: int = size // 2
+            res = self.join(
+                self.clip(node.nw, level - 1, h, w, height, width),
+                self.clip(node.ne, level - 1, h, w + half, height, width),
+                self.clip(node.sw, level - 1, h + half, w, height, width),
+                self.clip(node.se, level - 1, h + half, w + half, height, width)
+            )
+        self.__clipped[key] = res
+        return res
+
+    def build(self: "HashLife", cells: numpy.ndarray) -> MacroCell:
+        """Build the macro-cell of a (height, width) grid placed in its north-west corner"""
+        height, width = cells.shape
+        level: int = LEAF + 1
+        while (1 << level) < max(height, width):
+            level += 1
+        size: int = 1 << level
+
+        padded: numpy.ndarray = numpy.zeros((size, size), dtype=bool)
+        padded[:height, :width] = cells
+        blocks: numpy.ndarray = padded.reshape((size // 8, 8, size // 8, 8)).swapaxes(1, 2).reshape((-1, 64))
+        leaves: list[list[MacroCell | int]] = numpy.packbits(blocks, axis=1, bitorder="little").view("<u8").reshape((size // 8, size // 8)).tolist()
+
+        while len(leaves) > 1:
+            leaves = [[self.join(leaves[h][w], leaves[h][w + 1], leaves[h + 1][w], leaves[h + 1][w + 1]) for w in range(0, len(leaves), 2)] for h in range(0, len(leaves), 2)]
+        return leaves[0][0]
+
+    def unbuild(self: "HashLife", node: MacroCell, height: int, width: int) -> numpy.ndarray:
+        """Get the (height, width) grid in the north-west corner of the macro-cell"""
+        size: int = 1 << node.level
+        leaves: list[list[int]] = [[node]]
+        while not isinstance(leaves[0][0], int):
+            leaves = [row for line in leaves for row in ([sub for n in line for sub in (n.nw, n.ne)], [sub for n in line for sub in (n.sw, n.se)])]
+
+        blocks: numpy.ndarray = numpy.array(leaves, dtype=numpy.uint64).astype("<u8").view(numpy.uint8)
+        cells: numpy.ndarray = numpy.unpackbits(blocks.reshape((-1, 8)), axis=1, bitorder="little").astype(bool)
+        cells = cells.reshape((size // 8, size // 8, 8, 8)).swapaxes(1, 2).reshape((size, size))
+        return cells[:height, :width]
+
+    def run(self: "HashLife", cells: numpy.ndarray, generations: int) -> numpy.ndarray:
+        """
+        Compute the grid after some generations
+
+        Args:
+            cells (numpy.ndarray): the (height, width) boolean grid
+            generations (int): the number of generations to compute
+
+        Returns:
+            numpy.ndarray: the (height, width) grid after `generations` generations
+        """
+        if len(self.__nodes) + len(self.__clipped) > self.__limit:
+            self.__nodes.clear()
+            self.__clipped.clear()
+            self.__empty = {LEAF: 0}
+        self.__computed = 0
+        self.__created = 0
+
+        height, width = cells.shape
+        node: MacroCell = self.build(cells)
+        busy: int = (1 << (2 * (node.level - LEAF))) // 4
+        if 4 * self.__created > busy:
+            self.__computed = busy + 1
+        for gen in range(generations):
+            if self.__computed > busy:
+                cells = self.unbuild(node, height, width)
+                for _ in range(generations - gen):
+                    cells = nextGeneration(cells, countNeighbors(cells))
+                return cells
+
+            self.__computed = 0
+            empty: MacroCell | int = self.empty(node.level - 1)
+            node = self.step(self.join(
+                self.join(empty, empty, empty, node.nw),
+                self.join(empty, empty, node.ne, empty),
+                self.join(empty, node.sw, empty, empty),
+                self.join(node.se, empty, empty, empty)
+            ))
+            node = self.clip(node, node.level, 0, 0, height, width)
+        return self.unbuild(node, height, width)
+
+
+def leafCenter(nw: int, ne: int, sw: int, se: int) -> int:
+    """Get the centered 8x8 leaf of four 8x8 leaves"""
+    res: int = 0
+    for h in range(4):
+        res |= (((nw >> (8 * h + 36)) & 0xF) | (((ne >> (8 * h + 32)) & 0xF) << 4)) << (8 * h)
+        res |= (((sw >> (8 * h + 4)) & 0xF) | (((se >> (8 * h)) & 0xF) << 4)) << (8 * h + 32)
+    return res
+
+
+def leafStep(nw: int, ne: int, sw: int, se: int) -> int:
+    """Get the centered 8x8 leaf of four 8x8 leaves after one generation"""
+    x: int = 0
+    for h in range(8):
+        x |= (((nw >> (8 * h)) & 0xFF) | (((ne >> (8 * h)) & 0xFF) << 8)) << (16 * h)
+        x |= (((sw >> (8 * h)) & 0xFF) | (((se >> (8 * h)) & 0xFF) << 8)) << (16 * h + 128)
+
+    west: int = (x << 1) & ~COL_0_16 & FULL_16
+    east: int = (x >> 1) & ~COL_15_16
+    planes: tuple[int, ...] = (
+        (west << 16) & FULL_16, (x << 16) & FULL_16, (east << 16) & FULL_16,
+        west, east,
+        west >> 16, x >> 16, east >> 16
+    )
+
+    s_a, c_a = intAdder(planes[0], planes[1], planes[2])
+    s_b, c_b = intAdder(planes[3], planes[4], planes[5])
+    s_c, c_c = planes[6] ^ planes[7], planes[6] & planes[7]
+    ones, c_d = intAdder(s_a, s_b, s_c)
+    t_s, t_c = intAdder(c_a, c_b, c_c)
+    x = (t_s ^ c_d) & ~(t_c | (t_s & c_d)) & (ones | x)
+
+    res: int = 0
+    for h in range(8):
+        res |= ((x >> (16 * (h + 4) + 4)) & 0xFF) << (8 * h)
+    return res
+
+
+def intAdder(a: int, b: int, c: int) -> tuple[int, int]:
+    """Add three bit planes stored in ints, returns the sum and carry planes"""
+    ab: int = a ^ b
+    return ab ^ c, (a & b) | (c & ab)
+
+
+class CycleDetector:
+    """
+    Find when the grid comes back to a recent state with no move in between
+
+    Attributes:
+        DEPTH (const int): the longest period looked for
+        period (int): the period of the cycle found, 0 while there is none
+    """
+    def __init__(self: "CycleDetector", depth: int = 16) -> None:
+        self.DEPTH: int = depth
+        self.period: int = 0
+        self.__keys: collections.deque[bytes] = collections.deque(maxlen=depth)
+        self.__states: collections.deque[typing.Any] = collections.deque(maxlen=depth)
+        self.__cycle: list[typing.Any] = []
+        self.__next: int = 0
+
+    def reset(self: "CycleDetector") -> None:
+        """Forget every state, to call when a move broke the chain"""
+        self.period = 0
+        self.__keys.clear()
+        self.__states.clear()
+        self.__cycle = []
+        self.__next = 0
+
+    def push(self: "CycleDetector", key: bytes, state: typing.Any) -> int:
+        """
+        Remember the state reached one generation after the previous one
+
+        Args:
+            key (bytes): the content of the grid, equal keys mean equal grids
+            state (typing.Any): what is needed to restore the state later
+
+        Returns:
+            int: the period of the cycle if the state was already seen, else 0
+        """
+        for period, seen in enumerate(reversed(self.__keys), 1):
+            if seen == key:
+                self.period = period
+                self.__cycle = list(self.__states)[len(self.__states) - period + 1:] + [state]
+                self.__next = 0
+                return period
+        self.__keys.append(key)
+        self.__states.append(state)
+        return 0
+
+    def skip(self: "CycleDetector", generations: int = 0) -> typing.Any:
+        """
+        Get the state of the next generation, or `generations` generations after it, without computing it
+        """
+        self.__next = (self.__next + generations) % self.period
+        state: typing.Any = self.__cycle[self.__next]
+        self.__next = (self.__next + 1) % self.period
+        return state
+
+
+def paddedStep(block: numpy.ndarray) -> numpy.ndarray:
+    """
+    Apply the rule of the game to the inner cells of a block that includes a one-cell halo
+
+    Args:
+        block (numpy.ndarray): the (rows + 2, columns + 2) boolean block
+
+    Returns:
+        numpy.ndarray: the next generation of the (rows, columns) inner cells
+    """
+    padded: numpy.ndarray = block.astype(numpy.int8)
+    count: numpy.ndarray = padded[:-2, :-2] + padded[:-2, 1:-1]
+    count += padded[:-2, 2:]
+    count += padded[1:-1, :-2]
+    count += padded[1:-1, 2:]
+    count += padded[2:, :-2]
+    count += padded[2:, 1:-1]
+    count += padded[2:, 2:]
+    return (count == 3) | (block[1:-1, 1:-1] & (count == 2))
+
+
+# The seconds the game waits for the workers of the parallel engine at each step before giving up on them
+STEP_TIMEOUT: float = 10.0
+
+
+def bandWorker(buffers: list[numpy.ndarray], start: int, stop: int, conn: multiprocessing.connection.Connection) -> None:
+    """
+    Loop of a worker process: on each step, compute the rows [start, stop) from one buffer into the other
+
+    The game sends the index of the source buffer, -1 to stop, and the worker answers when its band is written\n
+    The rows just above and below the band are read from the shared buffer, this is the halo of the band
+    """
+    try:
+        while True:
+            src: int = conn.recv()
+            if src < 0:
+                return
+            buffers[1 - src][start + 1:stop + 1, 1:-1] = paddedStep(buffers[src][start:stop + 2])
+            conn.send(src)
+    except (EOFError, OSError):
+        # The game gave up on the workers, see ParallelCells
+        return
+
+
+class ParallelCells:
+    """
+    Cells in shared memory, stepped by worker processes that each own a horizontal band of rows
+
+    Attributes:
+        WORKERS (const int): the number of worker processes
+        TIMEOUT (const float): the seconds to wait for the workers at each step
+        cells (numpy.ndarray): writable (height, width) view of the current cells, it changes on every step
+
+    When a worker does not answer in TIMEOUT seconds, or dies (killed, out of memory...), the workers are stopped and
+    the next generations are computed by this process with the numpy engine\n
+    The workers are driven by one pipe each rather than a barrier: a barrier never wakes up the game when a worker
+    dies while waiting on it
+    """
+    def __init__(self: "ParallelCells", cells: numpy.ndarray, workers: int, timeout: float = STEP_TIMEOUT) -> None:
+        height, width = cells.shape
+        self.WORKERS: int = max(1, min(workers, height))
+        self.TIMEOUT: float = timeout
+
+        context: typing.Any = multiprocessing.get_context("fork")
+        self.__memory: list[multiprocessing.shared_memory.SharedMemory] = [multiprocessing.shared_memory.SharedMemory(create=True, size=(height + 2) * (width + 2)) for _ in range(2)]
+        self.__buffers: list[numpy.ndarray] = [numpy.ndarray((height + 2, width + 2), dtype=bool, buffer=memory.buf) for memory in self.__memory]
+        for buffer in self.__buffers:
+            buffer[...] = False
+        self.__buffers[0][1:-1, 1:-1] = cells
+        self.__current: int = 0
+        self.cells: numpy.ndarray = self.__buffers[0][1:-1, 1:-1]
+
+        bounds: list[int] = [height * i // self.WORKERS for i in range(self.WORKERS + 1)]
+        pipes: list[tuple[multiprocessing.connection.Connection, multiprocessing.connection.Connection]] = [context.Pipe() for _ in range(self.WORKERS)]
+        self.__conns: list[multiprocessing.connection.Connection] = [conn for conn, _ in pipes]
+        self.__workers: list[typing.Any] = [context.Process(target=bandWorker, args=(self.__buffers, bounds[i], bounds[i + 1], pipes[i][1]), daemon=True) for i in range(self.WORKERS)]
+        for worker in self.__workers:
+            worker.start()
+        for _, conn in pipes:
+            conn.close()
+        self.__finalizer: weakref.finalize = weakref.finalize(self, ParallelCells.release, self.__memory, self.__workers, self.__conns, self.TIMEOUT)
+
+    def step(self: "ParallelCells") -> None:
+        """
+        Compute the next generation, `cells` then views the other buffer
+        """
+        if not self.__finalizer.alive:
+            self.cells = nextGeneration(self.cells, countNeighbors(self.cells))
+            return
+
+        try:
+            for conn in self.__conns:
+                conn.send(self.__current)
+            waiting: list[typing.Any] = list(self.__conns)
+            sentinels: list[int] = [worker.sentinel for worker in self.__workers]
+            deadline: float = time.monotonic() + self.TIMEOUT
+            while waiting:
+                ready: list[typing.Any] = multiprocessing.connection.wait(waiting + sentinels, max(0.0, deadline - time.monotonic()))
+                if not ready:
+                    raise TimeoutError(f"A worker of the parallel engine did not answer in {self.TIMEOUT:g} s")
+                for conn in ready:
+                    if conn in sentinels:
+                        raise EOFError("A worker of the parallel engine stopped")
+                    conn.recv()
+                    waiting.remove(conn)
+        except (TimeoutError, EOFError, OSError):
+            # The workers only write the other buffer, the current cells are whole
+            cells: numpy.ndarray = self.cells.copy()
+            for worker in self.__workers:
+                worker.kill()
+            self.close()
+            self.cells = nextGeneration(cells, countNeighbors(cells))
+            return
+        self.__current = 1 - self.__current
+        self.cells = self.__buffers[self.__current][1:-1, 1:-1]
+
+    def close(self: "ParallelCells") -> None:
+        """
+        Stop the workers and free the shared memory, `cells` must not be used anymore while it views the shared memory
+        """
+        self.__finalizer()
+
+    @staticmethod
+    def release(memory: list[multiprocessing.shared_memory.SharedMemory], workers: list[typing.Any], conns: list[multiprocessing.connection.Connection], timeout: float) -> None:
+        for conn in conns:
+            try:
+                conn.send(-1)
+            except OSError:
+                pass
+            conn.close()
+        for worker in workers:
+            worker.join(timeout)
+            if worker.is_alive():
+                worker.kill()
+                worker.join()
+        for shared in memory:
+            shared.close()
+            shared.unlink()
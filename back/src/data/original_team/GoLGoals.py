@@ -0,0 +1,166 @@
+"""
+The Goals file of the game
+"""
+
+
+import dataclasses
+import functools
+import typing
+import numpy
+import GoLLib
+import GoLEngine
+
+
+Scorer = typing.Callable[[numpy.ndarray], int]
+
+
+@dataclasses.dataclass(frozen=True)
+class GoalRule:
+    """
+    How a goal is played and scored
+
+    Attributes:
+        last_moves (int): the moves given for each of the last 5 generations
+        moves (Callable[[int], int]): the moves given for the next generation, from the moves left
+        maximum (Callable[[int, int], int]): the best raw score on a grid of (width, height)
+        score (Scorer): the raw score of the (height, width) cells, the result is `score / maximum`
+    """
+    last_moves: int
+    moves: typing.Callable[[int], int]
+    maximum: typing.Callable[[int, int], int]
+    score: Scorer
+
+
+GOALS: dict[GoLLib.Goal, GoalRule] = {}
+
+
+def registerGoal(goal: GoLLib.Goal, rule: GoalRule) -> None:
+    """
+    Declare how a goal is played and scored, a goal is registered only once
+    """
+    if goal in GOALS:
+        raise ValueError(f"Goal {goal.name} already registered")
+    GOALS[goal] = rule
+
+
+def nextMoves(stage: GoLLib.StageData) -> int:
+    """
+    The moves of the stage for the next generation
+    """
+    rule: GoalRule = GOALS[stage.GOAL]
+    return rule.last_moves if (stage.gen >= stage.LAST_GEN - 5) else rule.moves(stage.moves)
+
+
+def scoreCells(goal: GoLLib.Goal, cells: numpy.ndarray) -> int:
+    """
+    The score of the (height, width) cells for a goal, in millionths of the best score
+    """
+    rule: GoalRule = GOALS[goal]
+    height, width = cells.shape
+    percent: float = rule.score(cells)
+    percent /= rule.maximum(width, height)
+    return round(percent * 1_000_000)
+
+
+def countCells(alive: bool = True) -> Scorer:
+    """
+    Score the number of alive cells, or of dead cells
+    """
+    def score(cells: numpy.ndarray) -> int:
+        res: int = int(numpy.count_nonzero(cells))
+        return res if alive else cells.size - res
+    return score
+
+
+def weightCells(weights: typing.Callable[[int, int], numpy.ndarray]) -> Scorer:
+    """
+    Score the sum of the weights of the alive cells, `weights(width, height)` is computed once per dimension
+
+    The weights are split into one mask per distinct weight, so the cost is a count per distinct weight
+    """
+    @functools.cache
+    def levels(width: int, height: int) -> list[tuple[int, numpy.ndarray]]:
+        res: numpy.ndarray = weights(width, height)
+        return [(int(weight), res == weight) for weight in numpy.unique(res) if weight]
+
+    def score(cells: numpy.ndarray) -> int:
+        return sum(weight * int(numpy.count_nonzero(cells & mask)) for weight, mask in levels(cells.shape[1], cells.shape[0]))
+    return score
+
+
+def matchPatterns(*patterns: numpy.ndarray) -> Scorer:
+    """
+    Score the number of windows that are exactly one of the patterns, all the patterns must have the same shape
+
+    The board is the one the patterns were always matched on: the cells read column by column then cut in rows of
+    width cells, padded with one dead cell, and only its windows starting in the first min(width, height) - size + 3
+    rows and columns, for patterns of size x size
+    """
+    size: int = patterns[0].shape[0]
+
+    def score(cells: numpy.ndarray) -> int:
+        height, width = cells.shape
+        if width == height:
+            # The board is then the transpose of the cells, the transposed patterns are counted on the cells instead
+            packed: GoLEngine.PackedCells = GoLEngine.PackedCells(numpy.pad(cells, 1))
+            return sum(GoLEngine.countPattern(packed, pattern.T) for pattern in patterns)
+        board: numpy.ndarray = numpy.zeros((height + 2, width + 2), dtype=bool)
+        board[1:-1, 1:-1] = cells.T.reshape((height, width))
+        packed = GoLEngine.PackedCells(board[:min(width, height) + 2, :min(width, height) + 2])
+        return sum(GoLEngine.countPattern(packed, pattern) for pattern in patterns)
+    return score
+
+
+def area(width: int, height: int) -> int:
+    return width * height
+
+
+def parityWeights(odd: bool) -> typing.Callable[[int, int], numpy.ndarray]:
+    """
+    Weigh 2 the cells of odd (or even) index `w + h * width`, so that a full half scores the area
+    """
+    def weights(width: int, height: int) -> numpy.ndarray:
+        res: numpy.ndarray = numpy.zeros(width * height, dtype=numpy.int64)
+        res[int(odd)::2] = 2
+        return res.reshape((height, width))
+    return weights
+
+
+def borderWeights(width: int, height: int) -> numpy.ndarray:
+    """
+    The weight of every cell in the BORDER score, from 5 on the outer ring to 1 on the fifth ring, 0 inside
+    """
+    weights: numpy.ndarray = numpy.zeros((height, width), dtype=numpy.int64)
+    for i in range(5):
+        weights[i, i:width - i] += 5 - i
+        weights[height - i - 1, i:width - i] += 5 - i
+        weights[i + 1:height - i - 1, i] += 5 - i
+        weights[i + 1:height - i - 1, width - i - 1] += 5 - i
+    return weights
+
+
+def maximumBorder(width: int, height: int) -> int:
+    res: int = 0
+    for i in range(5):
+        res += (5 - i) * 2 * ((width - 2 * i) + (height - 2 * i) - 2)
+    return res
+
+
+def maximumFix(width: int, height: int) -> int:
+    return (1 + (width - 4) // 3 + ((width - 4) % 3 == 2)) * (1 + (height - 4) // 3 + ((height - 4) % 3 == 2))
+
+
+BLOCK: numpy.ndarray = numpy.pad(numpy.ones((2, 2), dtype=bool), 1)
+BLINKER_H: numpy.ndarray = numpy.pad(numpy.ones((1, 3), dtype=bool), ((2, 2), (1, 1)))
+BLINKER_V: numpy.ndarray = BLINKER_H.T.copy()
+
+
+registerGoal(GoLLib.Goal.MORE, GoalRule(500 * 500, lambda moves: moves // 2 + 5, area, countCells(True)))
+registerGoal(GoLLib.Goal.LESS, GoalRule(500 * 500, lambda moves: moves // 2 + 5, area, countCells(False)))
+registerGoal(GoLLib.Goal.ODD, GoalRule(500 * 500 // 2, lambda moves: moves // 2 + 3, area, weightCells(parityWeights(True))))
+registerGoal(GoLLib.Goal.EVEN, GoalRule(500 * 500 // 2, lambda moves: moves // 2 + 3, area, weightCells(parityWeights(False))))
+registerGoal(GoLLib.Goal.BORDER, GoalRule(500 + 500 + 500 + 500, lambda moves: 15, maximumBorder, weightCells(borderWeights)))
+registerGoal(GoLLib.Goal.FIX, GoalRule(30, lambda moves: 30, maximumFix, matchPatterns(BLOCK)))
+# CLING has always been divided by the maximum of FIX, the scores of the shipped stages depend on it
+registerGoal(GoLLib.Goal.CLING, GoalRule(30, lambda moves: 30, maximumFix, matchPatterns(BLINKER_H, BLINKER_V)))
+registerGoal(GoLLib.Goal.YOU, GoalRule(30, lambda moves: 30, area, lambda cells: 0))
@@ -3,15 +3,54 @@ The Library file of the game
 """
 
 
-import inspect
 import dataclasses
 import enum
+import types
 import typing
+import numpy
+import GoLEngine
 
 
 RESTRICTED_LIB: str = "ModulePlayer"
 
 
+class Lock:
+    """
+    The lock of the game data, held by the game while the player plays
+
+    While it is held, the grid and the stage data can not be modified\n
+    Only the owner that acquired it can release it
+    """
+    def __init__(self: "Lock") -> None:
+        super().__setattr__('_Lock__owner', None)
+
+    def __setattr__(self: "Lock", name: str, value: typing.Any) -> None:
+        raise AttributeError("Could not set attribute")
+
+    def __delattr__(self: "Lock", name: str) -> None:
+        raise AttributeError("Could not delete attribute")
+
+    def acquire(self: "Lock", owner: object) -> None:
+        """Hold the lock until `owner` releases it"""
+        if self.__owner is not None:
+            raise RuntimeError("Lock already held")
+        super().__setattr__('_Lock__owner', id(owner))
+
+    def release(self: "Lock", owner: object) -> None:
+        """Release the lock held by `owner`"""
+        if self.__owner != id(owner):
+            raise RuntimeError("Lock not held by this owner")
+        super().__setattr__('_Lock__owner', None)
+
+    def check(self: "Lock") -> None:
+        """Refuse the modification while the lock is held"""
+        if self.__owner is not None:
+            raise AttributeError(f"Modification not allowed inside {RESTRICTED_LIB}")
+
+
+LOCK: Lock = Lock()
+
+
 class Goal(enum.IntEnum):
     """The goal of the stage"""
     MORE = 1
@@ -42,6 +81,21 @@ class Pos:
 Coord = int | Pos
 
 
+class Idle:
+    """
+    Return `IDLE` from `ModulePlayer.play` to declare that you will not play anymore in this stage\n
+    The game may then stop calling you and skip the generations it can predict
+    """
+    def __repr__(self: "Idle") -> str:
+        return "IDLE"
+
+
+IDLE: Idle = Idle()
+
+
+GRID_METHODS: frozenset[str] = frozenset({'view', '__array__', 'row', 'rect', 'count', 'alive'})
+
+
 class Grid:
     """
     The grid of the game
@@ -49,30 +103,38 @@ class Grid:
     Attributes:
         __width (const private int): the width of the grid
         __height (const private int): the height of the grid
-        __data (private list[bool]): grid but linear
+        __data (private numpy.ndarray | GoLEngine.PackedCells): grid of shape (height, width)
 
     You can not get or set attributes\n
     But you can get or set items (ex: `grid = Grid(w, h)`):
-    - `grid[Pos(x, y)]` is like `grid.__data[x + y * grid.__width]`
-    - `grid[x]` is like `grid.__data[x]`
+    - `grid[Pos(x, y)]` is like `grid.__data[y][x]`
+    - `grid[x]` is like `grid.__data[x // grid.__width][x % grid.__width]`
+
+    To read many cells, `grid.view()` (or `numpy.asarray(grid)`) gives the whole grid as a read-only (height, width) array\n
+    `grid.row(h)` and `grid.rect(w, h, width, height)` give parts of it, `grid.count(w, h, width, height)` counts the
+    alive cells of a rectangle in constant time and `grid.alive()` lists the alive cells
     """
-    def __init__(self: "Grid", width: int, height: int, grid: list[bool]) -> None:
+    def __init__(self: "Grid", width: int, height: int, grid: list[bool] | numpy.ndarray | GoLEngine.PackedCells) -> None:
         super().__setattr__('__width', width)
         super().__setattr__('__height', height)
-        super().__setattr__('__data', grid.copy())
+        if isinstance(grid, GoLEngine.PackedCells):
+            super().__setattr__('__data', grid.copy())
+        else:
+            super().__setattr__('__data', numpy.array(grid, dtype=bool).reshape((height, width)))
+        super().__setattr__('__view', None)
+        super().__setattr__('__summed', None)
+        super().__setattr__('__alive', None)
 
-    def __getattribute__(self: "Grid", name: typing.Any) -> None:
-        raise Exception("Could not get attribute")
+    def __getattribute__(self: "Grid", name: typing.Any) -> typing.Any:
+        if name in GRID_METHODS:
+            return super().__getattribute__(name)
+        raise AttributeError("Could not get attribute")
 
     def __getattr__(self: "Grid", name: typing.Any) -> None:
-        raise Exception("Could not get attribute")
+        raise AttributeError("Could not get attribute")
 
     def __setattr__(self: "Grid", name: str, value: typing.Any) -> None:
-        stack = inspect.stack()
-        for frame in stack:
-            module = inspect.getmodule(frame[0])
-            if module and module.__name__.startswith(RESTRICTED_LIB):
-                raise AttributeError(f"Modification not allowed inside {module.__name__}")
+        LOCK.check()
 
         super().__setattr__(name, value)
 
@@ -83,15 +145,16 @@ class Grid:
         if not isinstance(key, Coord):
             raise TypeError("Index must be an int or a Pos")
 
+        width: int = super().__getattribute__('__width')
         pos: int = -1
         if isinstance(key, Pos):
-            pos = key.w + key.h * super().__getattribute__('__width')
+            pos = key.w + key.h * width
         else:
             pos = key
 
-        if pos < 0 or pos >= (super().__getattribute__('__width') * super().__getattribute__('__height')):
+        if pos < 0 or pos >= (width * super().__getattribute__('__height')):
             raise IndexError("Index out of range")
-        return super().__getattribute__('__data')[pos]
+        return bool(super().__getattribute__('__data')[pos // width, pos % width])
 
     def __setitem__(self: "Grid", key: typing.Any, value: typing.Any) -> None:
         if not isinstance(key, Coord):
@@ -99,33 +162,106 @@ class Grid:
         if not isinstance(value, bool):
             raise TypeError("Value must be a boolean")
 
-        stack = inspect.stack()
-        for frame in stack:
-            module = inspect.getmodule(frame[0])
-            if module and module.__name__.startswith(RESTRICTED_LIB):
-                raise AttributeError(f"Modification not allowed inside {module.__name__}")
+        LOCK.check()
 
+        width: int = super().__getattribute__('__width')
         pos: int = -1
         if isinstance(key, Pos):
-            pos = key.w + key.h * super().__getattribute__('__width')
+            pos = key.w + key.h * width
         else:
             pos = key
 
-        if pos < 0 or pos >= (super().__getattribute__('__width') * super().__getattribute__('__height')):
+        if pos < 0 or pos >= (width * super().__getattribute__('__height')):
             raise IndexError("Index out of range")
-        super().__getattribute__('__data')[pos] = value
+        super().__getattribute__('__data')[pos // width, pos % width] = value
+        super().__setattr__('__view', None)
+        super().__setattr__('__summed', None)
+        super().__setattr__('__alive', None)
 
     def __delitem__(self: "Grid", key: typing.Any) -> None:
         raise Exception("Could not delete item")
 
+    def view(self: "Grid") -> numpy.ndarray:
+        """
+        Get the grid as a (height, width) boolean array, `view()[h, w]` is like `grid[Pos(w, h)]`
+
+        The array is a copy of the grid, made once per generation: it can not be written and can not be made writable\n
+        It does not follow the grid, so get it again on every call of `play`
+        """
+        view: numpy.ndarray | None = super().__getattribute__('__view')
+        if view is None:
+            # Built on immutable bytes, so that no array of the chain can be made writable
+            data: numpy.ndarray = numpy.asarray(super().__getattribute__('__data'))
+            view = numpy.frombuffer(data.tobytes(), dtype=bool).reshape(data.shape)
+            super().__setattr__('__view', view)
+        return view
+
+    def __array__(self: "Grid", dtype: typing.Any = None, copy: typing.Any = None) -> numpy.ndarray:
+        res: numpy.ndarray = super().__getattribute__('view')()
+        if dtype is not None and numpy.dtype(dtype) != res.dtype:
+            if copy is False:
+                raise ValueError(f"The grid can not be read as {numpy.dtype(dtype)} without a copy")
+            return res.astype(dtype)
+        return res.copy() if copy else res
+
+    def row(self: "Grid", h: int) -> numpy.ndarray:
+        """
+        Get the row `h` of the grid as a read-only array, like `view()[h]`
+        """
+        if h < 0 or h >= super().__getattribute__('__height'):
+            raise IndexError("Index out of range")
+        return super().__getattribute__('view')()[h]
+
+    def rect(self: "Grid", w: int, h: int, width: int, height: int) -> numpy.ndarray:
+        """
+        Get the rectangle of `width` columns and `height` rows from the cell (w, h) as a read-only array,
+        like `view()[h:h + height, w:w + width]`
+        """
+        if w < 0 or h < 0 or width < 0 or height < 0 or w + width > super().__getattribute__('__width') or h + height > super().__getattribute__('__height'):
+            raise IndexError("Region out of range")
+        return super().__getattribute__('view')()[h:h + height, w:w + width]
+
+    def count(self: "Grid", w: int = 0, h: int = 0, width: int | None = None, height: int | None = None) -> int:
+        """
+        Count the alive cells of the rectangle from the cell (w, h), of the whole grid by default
+
+        The sums are computed once per generation, then every count takes constant time
+        """
+        grid_width: int = super().__getattribute__('__width')
+        grid_height: int = super().__getattribute__('__height')
+        width = grid_width - w if width is None else width
+        height = grid_height - h if height is None else height
+        if w < 0 or h < 0 or width < 0 or height < 0 or w + width > grid_width or h + height > grid_height:
+            raise IndexError("Region out of range")
+
+        summed: numpy.ndarray | None = super().__getattribute__('__summed')
+        if summed is None:
+            summed = numpy.zeros((grid_height + 1, grid_width + 1), dtype=numpy.int32)
+            summed[1:, 1:] = numpy.asarray(super().__getattribute__('__data')).cumsum(axis=0, dtype=numpy.int32).cumsum(axis=1)
+            super().__setattr__('__summed', summed)
+        return int(summed[h + height, w + width] - summed[h, w + width] - summed[h + height, w] + summed[h, w])
+
+    def alive(self: "Grid") -> numpy.ndarray:
+        """
+        Get the alive cells as a read-only array of `w + h * width`, in order
+
+        The list is computed once per generation
+        """
+        alive: numpy.ndarray | None = super().__getattribute__('__alive')
+        if alive is None:
+            alive = numpy.flatnonzero(numpy.asarray(super().__getattribute__('__data')))
+            alive.flags.writeable = False
+            super().__setattr__('__alive', alive)
+        return alive
+
     def __len__(self: "Grid") -> int:
-        return len(super().__getattribute__('__data'))
+        return super().__getattribute__('__width') * super().__getattribute__('__height')
 
     def __contains__(self: "Grid", item: bool) -> bool:
-        return item in super().__getattribute__('__data')
+        return bool(item in numpy.asarray(super().__getattribute__('__data')))
 
     def __iter__(self: "Grid"):
-        return iter(super().__getattribute__('__data'))
+        return iter(numpy.asarray(super().__getattribute__('__data')).ravel().tolist())
 
     def __next__(self: "Grid") -> bool:
         return next(self.__iter__())
@@ -144,9 +280,11 @@ class StageData:
         moves (int): the number of moves
         gen (int): the current generation
 
-    You can not set attributes
+    You can not set attributes\n
+    `stage.neighbors()` gives the number of alive neighbors of every cell and `stage.changed()` the cells that
+    changed since your previous call of it, both read-only
     """
-    def __init__(self: "StageData", width: int, height: int, goal: int, last_gen: int, grid: list[bool]) -> None:
+    def __init__(self: "StageData", width: int, height: int, goal: int, last_gen: int, grid: list[bool] | numpy.ndarray | GoLEngine.PackedCells) -> None:
         self.WIDTH: int = width
         self.HEIGHT: int = height
         self.GOAL: Goal = Goal(goal)
@@ -154,15 +292,151 @@ class StageData:
         self.grid: Grid = Grid(width, height, grid)
         self.moves: int = 0
         self.gen: int = 0
+        super().__setattr__('__counts', None)
+        super().__setattr__('__neighbor', None)
+        super().__setattr__('__changed', None)
+        super().__setattr__('__seen', None)
 
     def __setattr__(self: "StageData", name: str, value: typing.Any) -> None:
-        stack = inspect.stack()
-        for frame in stack:
-            module = inspect.getmodule(frame[0])
-            if module and module.__name__.startswith(RESTRICTED_LIB):
-                raise AttributeError(f"Modification not allowed inside {module.__name__}")
+        LOCK.check()
 
         super().__setattr__(name, value)
 
     def __delattr__(self: "StageData", name: str) -> None:
         raise Exception("Could not delete attribute")
+
+    def neighbors(self: "StageData") -> numpy.ndarray:
+        """
+        Get the number of alive neighbors of every cell as a read-only (HEIGHT, WIDTH) array,
+        `neighbors()[h, w]` is for the cell `Pos(w, h)`, outside of the grid is dead
+
+        The array is made once per turn, a copy of the counts of the game when it keeps them, otherwise they are counted
+        """
+        neighbor: numpy.ndarray | None = super().__getattribute__('__neighbor')
+        if neighbor is None:
+            counts: numpy.ndarray | None = super().__getattribute__('__counts')
+            if counts is None:
+                counts = GoLEngine.countNeighbors(self.grid.view())
+            # Built on immutable bytes like Grid.view, the counts of the game can not be reached from it
+            neighbor = numpy.frombuffer(counts.tobytes(), dtype=counts.dtype).reshape(counts.shape)
+            super().__setattr__('__neighbor', neighbor)
+        return neighbor
+
+    def changed(self: "StageData") -> numpy.ndarray:
+        """
+        Get the cells that changed since your previous call in the stage, by your moves or by the generations, as a
+        read-only array of `w + h * WIDTH` in order\n
+        On your first call in the stage, it gives the alive cells; call it on every turn to get the changes of each turn
+
+        The grid is only copied for the players that call it
+        """
+        changed: numpy.ndarray | None = super().__getattribute__('__changed')
+        if changed is None:
+            cells: numpy.ndarray = self.grid.view()
+            seen: numpy.ndarray | None = super().__getattribute__('__seen')
+            if seen is None:
+                changed = self.grid.alive()
+            else:
+                changed = numpy.flatnonzero(cells ^ seen)
+                changed.flags.writeable = False
+            super().__setattr__('__seen', cells)
+            super().__setattr__('__changed', changed)
+        return changed
+
+
+SIMULATOR: GoLEngine.HashLife = GoLEngine.HashLife()
+
+
+def simulate(grid: Grid, generations: int, flips: typing.Iterable[Coord] = ()) -> Grid:
+    """
+    Look ahead: the grid after swapping some cells then running some generations
+
+    Identical regions are computed once and remembered between calls,\n
+    so looking far ahead on a mostly stable grid is cheap
+
+    Args:
+        grid (Grid): the grid to start from, it is not modified
+        generations (int): the number of generations to run
+        flips (Iterable[Coord]): the cells to swap before running, like `played` in `ModulePlayer.play`
+
+    Returns:
+        Grid: the future grid, read-only
+    """
+    if generations < 0:
+        raise ValueError("Generations must be positive")
+
+    cells: numpy.ndarray = numpy.array(object.__getattribute__(grid, '__data'), dtype=bool)
+    height, width = cells.shape
+    pos: int
+    for flip in flips:
+        if not isinstance(flip, Coord):
+            raise TypeError("Index must be an int or a Pos")
+        pos = flip.w + flip.h * width if isinstance(flip, Pos) else flip
+        if pos < 0 or pos >= width * height:
+            continue
+        cells[pos // width, pos % width] ^= True
+
+    res: Grid = Grid(width, height, SIMULATOR.run(cells, generations))
+    object.__getattribute__(res, '__data').flags.writeable = False
+    return res
+
+
+# The modules given to the player, the only ones that can be imported for it
+PRELUDE: tuple[str, ...] = ("types", "typing", "collections", "functools", "itertools", "dataclasses", "enum", "time", "random", "math", "cmath", "heapq", "bisect", "array", "decimal", "fractions", "statistics", "numpy", "sympy", "networkx", "sortedcontainers")
+# Imports a module of the prelude, set by the game: GoLLib keeps no import machinery the player could reach
+IMPORTER: typing.Callable[[str], types.ModuleType] | None = None
+
+
+class LazyModule:
+    """
+    A module of the prelude, imported on the first access to one of its attributes
+
+    The module then replaces the proxy in the namespace of the player, so only the first access goes through it\n
+    The import is made by the game during the turn of the player, outside of its time budget
+    """
+    def __init__(self: "LazyModule", name: str, namespace: dict[str, typing.Any]) -> None:
+        if name not in PRELUDE:
+            raise ImportError(f"{name} is not a module of the prelude")
+        super().__setattr__('__name', name)
+        super().__setattr__('__namespace', namespace)
+        super().__setattr__('__module', None)
+
+    def __load(self: "LazyModule") -> types.ModuleType:
+        module: types.ModuleType | None = super().__getattribute__('__module')
+        if module is not None:
+            return module
+
+        name: str = super().__getattribute__('__name')
+        if name not in PRELUDE:
+            raise ImportError(f"{name} is not a module of the prelude")
+        if IMPORTER is None:
+            raise ImportError(f"{name} can only be imported during a game")
+        module = IMPORTER(name)
+        super().__setattr__('__module', module)
+        namespace: dict[str, typing.Any] = super().__getattribute__('__namespace')
+        if namespace.get(name) is self:
+            namespace[name] = module
+        return module
+
+    def __getattr__(self: "LazyModule", name: str) -> typing.Any:
+        return getattr(self.__load(), name)
+
+    def __setattr__(self: "LazyModule", name: str, value: typing.Any) -> None:
+        setattr(self.__load(), name, value)
+
+    def __delattr__(self: "LazyModule", name: str) -> None:
+        delattr(self.__load(), name)
+
+    def __dir__(self: "LazyModule") -> list[str]:
+        return dir(self.__load())
+
+    def __repr__(self: "LazyModule") -> str:
+        return repr(self.__load())
+
+
+def bindPrelude(namespace: dict[str, typing.Any]) -> None:
+    """
+    Bind every module of the prelude in `namespace` to its lazy proxy, done by the first line of ModulePlayer
+    """
+    for name in PRELUDE:
+        namespace[name] = LazyModule(name, namespace)
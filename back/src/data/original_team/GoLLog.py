@@ -0,0 +1,478 @@
+"""
+The Log file of the game, the records that follow the stage and its separator in `logs/<stage>.log`
+
+Text (the default), one line per record:
+    Frame: <generation> <move> <move> ... [Time: <wall> <cpu>]: the seconds the player took, when it was called
+    Score: <generation> <score>
+    Active: <generation> <active tiles>
+    Snapshot: <generation> <cells>: the cells at the end of the generation, the base64 of their packed bitmap
+    Index: <interval> <generation> <position> ...: the last line, the position of the snapshot of each generation
+
+Compact, the bytes `GoLF` then one record per frame or line, every number is an unsigned LEB128 varint:
+    `F` <generation> <count> <moves>: the moves in order, each one as the zigzag of its difference to the previous one
+    `B` <generation> <bitmap>: the moves as ceil(width * height / 8) bytes, the move `m` is the bit `m % 8` of the
+        byte `m // 8`, only used for strictly increasing moves so that it gives back the same list
+    `S` <generation> <cells>: the cells at the end of the generation, packed as the bitmap of `B`
+    `P` <wall> <cpu>: the microseconds the player took for the frame that follows
+    `T` <length> <line>: any other line, as text without its newline
+    `X` <interval> <count> <generation> <position>...: the index of the snapshots, followed by the position of this
+        record as a little-endian uint64 and the bytes `GoLX`, so that it can be read from the end of the file
+
+A snapshot can be written every `interval` generations, so that a reader can start from the closest one (see seekLog),
+it is only written once the records since the previous one take SNAPSHOT_RATIO times its size: the snapshots stay a
+small part of the log, whatever the size of the grid
+
+Usage: python3 GoLLog.py <log> [<destination>], rewrite a log with text records, in place by default
+"""
+
+
+import io
+import os
+import sys
+import enum
+import base64
+import struct
+import queue
+import typing
+import threading
+import numpy
+import GoLStage
+import GoLEngine
+
+
+COMPACT_MAGIC: bytes = b"GoLF"
+LOG_BUFFER: int = 1 << 20
+INDEX_MAGIC: bytes = b"GoLX"
+INDEX_TRAILER: struct.Struct = struct.Struct("<Q4s")
+SNAPSHOT_INTERVAL: int = 10
+SNAPSHOT_RATIO: int = 4
+NO_MOVES: numpy.ndarray = numpy.zeros(0, dtype=numpy.int64)
+
+
+class Frame(typing.NamedTuple):
+    """The moves of a generation, in order, and the wall and CPU seconds of the player when it was called"""
+    gen: int
+    moves: numpy.ndarray
+    wall: float | None = None
+    cpu: float | None = None
+
+
+class Snapshot(typing.NamedTuple):
+    """The cells at the end of a generation, packed as the bitmap of the compact frames"""
+    gen: int
+    packed: bytes
+
+    def unpack(self: "Snapshot", width: int, height: int) -> numpy.ndarray:
+        """Get the (height, width) cells"""
+        bits: numpy.ndarray = numpy.unpackbits(numpy.frombuffer(self.packed, dtype=numpy.uint8), count=width * height, bitorder="little")
+        return bits.astype(bool).reshape((height, width))
+
+
+Record = Frame | Snapshot | str
+
+
+class LogFormat(enum.StrEnum):
+    """The format of the records of a log"""
+    TEXT = "text"
+    COMPACT = "compact"
+
+
+def encodeVarints(values: numpy.ndarray) -> bytes:
+    """
+    Encode unsigned integers as LEB128 varints, 7 bits per byte with the high bit set on every byte but the last
+    """
+    values = numpy.asarray(values, dtype=numpy.uint64)
+    sizes: numpy.ndarray = numpy.ones(len(values), dtype=numpy.int64)
+    for k in range(1, 10):
+        sizes += values >= numpy.uint64(1 << (7 * k))
+    starts: numpy.ndarray = numpy.cumsum(sizes) - sizes
+    res: numpy.ndarray = numpy.zeros(int(sizes.sum()), dtype=numpy.uint8)
+    for k in range(int(sizes.max(initial=0))):
+        sel: numpy.ndarray = sizes > k
+        low: numpy.ndarray = (values[sel] >> numpy.uint64(7 * k)) & numpy.uint64(0x7F)
+        res[starts[sel] + k] = low | numpy.where(sizes[sel] > k + 1, numpy.uint64(0x80), numpy.uint64(0))
+    return res.tobytes()
+
+
+def decodeVarints(data: bytes, pos: int, count: int) -> tuple[numpy.ndarray, int]:
+    """
+    Decode `count` varints of `data` from `pos`
+
+    Returns:
+        tuple[numpy.ndarray, int]: the uint64 values and the position after the last one
+    """
+    if not count:
+        return numpy.zeros(0, dtype=numpy.uint64), pos
+    buffer: numpy.ndarray = numpy.frombuffer(data, dtype=numpy.uint8, count=min(10 * count, len(data) - pos), offset=pos)
+    ends: numpy.ndarray = numpy.flatnonzero(buffer < 0x80)[:count]
+    if len(ends) < count:
+        raise ValueError("Truncated compact log")
+    starts: numpy.ndarray = numpy.concatenate(([0], ends[:-1] + 1))
+    values: numpy.ndarray = numpy.zeros(count, dtype=numpy.uint64)
+    for k in range(int((ends - starts).max()) + 1):
+        sel: numpy.ndarray = starts + k <= ends
+        values[sel] |= (buffer[starts[sel] + k] & 0x7F).astype(numpy.uint64) << numpy.uint64(7 * k)
+    return values, pos + int(ends[-1]) + 1
+
+
+def readVarint(data: bytes, pos: int) -> tuple[int, int]:
+    """
+    Decode one varint of `data` from `pos`
+
+    Returns:
+        tuple[int, int]: the value and the position after it
+    """
+    value: int = 0
+    shift: int = 0
+    while True:
+        byte: int = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def encodeFrame(gen: int, moves: numpy.ndarray, width: int, height: int, log_format: LogFormat, wall: float | None = None, cpu: float | None = None) -> bytes:
+    """
+    Encode the moves of a frame, as a varint list or as a bitmap in the compact format, whichever is smaller
+    """
+    if log_format == LogFormat.TEXT:
+        timing: list[str] = [] if wall is None else [f"Time: {wall:.6f} {cpu or 0:.6f}"]
+        return (" ".join([f"Frame: {gen}", *map(str, moves.tolist()), *timing]) + "\n").encode("iso8859")
+    if wall is not None:
+        return b"P" + encodeVarints([round(wall * 1e6), round((cpu or 0) * 1e6)]) + encodeFrame(gen, moves, width, height, log_format)
+
+    deltas: numpy.ndarray = numpy.diff(moves, prepend=0)
+    if len(moves) * 8 >= width * height and bool((deltas[1:] > 0).all()):
+        mask: numpy.ndarray = numpy.zeros(width * height, dtype=bool)
+        mask[moves] = True
+        return b"B" + encodeVarints([gen]) + numpy.packbits(mask, bitorder="little").tobytes()
+    zigzag: numpy.ndarray = (deltas << 1) ^ (deltas >> 63)
+    return b"F" + encodeVarints([gen, len(moves)]) + encodeVarints(zigzag.view(numpy.uint64))
+
+
+def encodeSnapshot(gen: int, packed: bytes, log_format: LogFormat) -> bytes:
+    """Encode the packed cells at the end of a generation"""
+    if log_format == LogFormat.TEXT:
+        return f"Snapshot: {gen} {base64.b64encode(packed).decode('ascii')}\n".encode("iso8859")
+    return b"S" + encodeVarints([gen]) + packed
+
+
+def encodeLine(line: str, log_format: LogFormat) -> bytes:
+    """Encode a line that is not a frame"""
+    if log_format == LogFormat.TEXT:
+        return (line + "\n").encode("iso8859")
+    return b"T" + encodeVarints([len(line)]) + line.encode("iso8859")
+
+
+class LogWriter:
+    """
+    Append the records of a stage to its log, the file stays open for the whole stage and the records are encoded
+    and written by a background thread, the index of the snapshots is written on close
+
+    Attributes:
+        WIDTH (const int): the width of the stage
+        HEIGHT (const int): the height of the stage
+        FORMAT (const LogFormat): the format of the records
+        INTERVAL (const int): the generations between two snapshots at least, 0 for no snapshot
+    """
+    def __init__(self: "LogWriter", file: str, width: int, height: int, log_format: LogFormat = LogFormat.TEXT, interval: int = SNAPSHOT_INTERVAL) -> None:
+        self.WIDTH: int = width
+        self.HEIGHT: int = height
+        self.FORMAT: LogFormat = LogFormat(log_format)
+        self.INTERVAL: int = interval
+        self.__index: dict[int, int] = {}
+        self.__file: typing.BinaryIO = open(file, "ab", buffering=LOG_BUFFER)
+        self.__queue: queue.SimpleQueue[Record | threading.Event | None] = queue.SimpleQueue()
+        self.__error: BaseException | None = None
+        if self.FORMAT == LogFormat.COMPACT:
+            self.__file.write(COMPACT_MAGIC)
+        self.__last: int = self.__file.tell()
+        self.__thread: threading.Thread = threading.Thread(target=self.__write, daemon=True)
+        self.__thread.start()
+
+    def frame(self: "LogWriter", gen: int, moves: numpy.ndarray = NO_MOVES, wall: float | None = None, cpu: float | None = None) -> None:
+        """Log the moves of a generation and the time of the player, `moves` must not be modified afterwards"""
+        self.__queue.put(Frame(gen, moves, wall, cpu))
+
+    def snapshot(self: "LogWriter", gen: int, cells: numpy.ndarray) -> None:
+        """Log the cells at the end of a generation if it is a multiple of INTERVAL, and the log has grown enough"""
+        if self.INTERVAL and gen % self.INTERVAL == 0:
+            self.__queue.put(Snapshot(gen, numpy.packbits(cells, axis=None, bitorder="little").tobytes()))
+
+    def line(self: "LogWriter", line: str) -> None:
+        """Log a line that is not a frame, without its newline"""
+        self.__queue.put(line)
+
+    def flush(self: "LogWriter") -> None:
+        """Wait until every record logged so far is encoded and written to the buffer of the file"""
+        done: threading.Event = threading.Event()
+        self.__queue.put(done)
+        done.wait()
+
+    def close(self: "LogWriter") -> None:
+        """
+        Write every record left and close the file, raise the error of the background thread if any
+        """
+        self.__queue.put(None)
+        self.__thread.join()
+        if self.INTERVAL and self.__error is None:
+            self.__file.write(encodeIndex(self.INTERVAL, self.__index, self.__file.tell(), self.FORMAT))
+        self.__file.close()
+        if self.__error is not None:
+            raise self.__error
+
+    def __enter__(self: "LogWriter") -> "LogWriter":
+        return self
+
+    def __exit__(self: "LogWriter", *args: typing.Any) -> None:
+        self.close()
+
+    def __write(self: "LogWriter") -> None:
+        while (record := self.__queue.get()) is not None:
+            if isinstance(record, threading.Event):
+                record.set()
+                continue
+            if self.__error is not None:
+                continue
+            try:
+                if isinstance(record, str):
+                    self.__file.write(encodeLine(record, self.FORMAT))
+                elif isinstance(record, Snapshot):
+                    encoded: bytes = encodeSnapshot(record.gen, record.packed, self.FORMAT)
+                    if self.__file.tell() - self.__last >= SNAPSHOT_RATIO * len(encoded):
+                        self.__index[record.gen] = self.__file.tell()
+                        self.__file.write(encoded)
+                        self.__last = self.__file.tell()
+                else:
+                    self.__file.write(encodeFrame(record.gen, record.moves, self.WIDTH, self.HEIGHT, self.FORMAT, record.wall, record.cpu))
+            except BaseException as e:
+                self.__error = e
+
+
+def parseInts(data: bytes, start: int, end: int) -> numpy.ndarray:
+    """
+    Parse the integers separated by spaces of `data[start:end]`, without copying it to a string
+    """
+    raw: numpy.ndarray = numpy.frombuffer(data, dtype=numpy.uint8, count=end - start, offset=start)
+    spaces: numpy.ndarray = numpy.flatnonzero(raw == ord(" "))
+    starts: numpy.ndarray = numpy.concatenate(([0], spaces + 1))
+    ends: numpy.ndarray = numpy.concatenate((spaces, [len(raw)]))
+    starts, ends = starts[ends > starts], ends[ends > starts]
+    negative: numpy.ndarray = raw[starts] == ord("-")
+    starts = starts + negative
+    values: numpy.ndarray = numpy.zeros(len(starts), dtype=numpy.int64)
+    # One digit of every number at a time, the numbers are short and many
+    for k in range(int((ends - starts).max(initial=0))):
+        sel: numpy.ndarray = starts + k < ends
+        values[sel] = values[sel] * 10 + (raw[starts[sel] + k] - ord("0"))
+    return numpy.where(negative, -values, values)
+
+
+def textRecords(data: bytes, pos: int) -> typing.Iterator[Record]:
+    """Read the text records of a log from `pos`, up to its index"""
+    while pos < len(data):
+        end: int = data.find(b"\n", pos)
+        end = len(data) if end < 0 else end
+        start: int = pos
+        pos = end + 1
+        if data[start:start + 7] == b"Frame: ":
+            # The moves are parsed from the bytes of the log, the lines of large stages take megabytes
+            stop: int = data.find(b" Time: ", start, end)
+            timing: list[bytes] = data[stop + len(b" Time: "):end].split() if stop >= 0 else []
+            stop = end if stop < 0 else stop
+            space: int = data.find(b" ", start + 7, stop)
+            space = stop if space < 0 else space
+            moves: numpy.ndarray = parseInts(data, space + 1, stop) if space < stop else NO_MOVES
+            yield Frame(int(data[start + 7:space]), moves, *map(float, timing))
+            continue
+        line: str = data[start:end].decode("iso8859")
+        if line.startswith("Snapshot:"):
+            _, gen, packed = line.split()
+            yield Snapshot(int(gen), base64.b64decode(packed))
+        elif line.startswith("Index:"):
+            return
+        elif line:
+            yield line
+
+
+def compactRecords(data: bytes, pos: int, width: int, height: int) -> typing.Iterator[Record]:
+    """Read the compact records of a log from `pos`, up to its index"""
+    size: int = (width * height + 7) // 8
+    gen: int
+    timing: tuple[float, float] | tuple[()] = ()
+    while pos < len(data):
+        kind: bytes = data[pos:pos + 1]
+        if kind == b"P":
+            wall, pos = readVarint(data, pos + 1)
+            cpu, pos = readVarint(data, pos)
+            timing = (wall / 1e6, cpu / 1e6)
+        elif kind == b"F":
+            gen, pos = readVarint(data, pos + 1)
+            count, pos = readVarint(data, pos)
+            zigzag, pos = decodeVarints(data, pos, count)
+            deltas: numpy.ndarray = (zigzag >> numpy.uint64(1)).view(numpy.int64) ^ -(zigzag & numpy.uint64(1)).view(numpy.int64)
+            yield Frame(gen, numpy.cumsum(deltas), *timing)
+            timing = ()
+        elif kind == b"B":
+            gen, pos = readVarint(data, pos + 1)
+            bitmap: numpy.ndarray = numpy.frombuffer(data, dtype=numpy.uint8, count=size, offset=pos)
+            pos += size
+            yield Frame(gen, numpy.flatnonzero(numpy.unpackbits(bitmap, count=width * height, bitorder="little")), *timing)
+            timing = ()
+        elif kind == b"S":
+            gen, pos = readVarint(data, pos + 1)
+            yield Snapshot(gen, bytes(data[pos:pos + size]))
+            pos += size
+        elif kind == b"T":
+            length, pos = readVarint(data, pos + 1)
+            yield bytes(data[pos:pos + length]).decode("iso8859")
+            pos += length
+        elif kind == b"X":
+            return
+        else:
+            raise ValueError(f"Unknown compact record {kind!r} at {pos}")
+
+
+def splitLog(data: bytes) -> tuple[tuple[int, int, int, int, numpy.ndarray], int]:
+    """
+    Read the stage at the start of a log
+
+    Returns:
+        tuple[tuple[int, int, int, int, numpy.ndarray], int]: the stage as GoLStage.readStage and the offset of the
+        records, just after the separator
+    """
+    separator: bytes = GoLStage.SEPARATOR.encode("iso8859")
+    if GoLStage.isBinary(data):
+        stage: tuple[int, int, int, int, numpy.ndarray] = GoLStage.parseBinary(data)
+        return stage, GoLStage.binarySize(*stage[:2]) + len(separator)
+    end: int = data.find(b"\n" + separator) + 1
+    if not end:
+        raise ValueError("No separator after the stage of the log")
+    head: str = bytes(data[:end]).decode("iso8859")
+    if GoLStage.isRLE(head):
+        return GoLStage.parseRLE(head), end + len(separator)
+    return GoLStage.readText(io.BytesIO(data[:end])), end + len(separator)
+
+
+def isCompact(data: bytes, offset: int) -> bool:
+    """Whether the records of a log, starting at `offset`, are compact"""
+    return data[offset:offset + len(COMPACT_MAGIC)] == COMPACT_MAGIC
+
+
+def records(data: bytes, offset: int, pos: int, width: int, height: int) -> typing.Iterator[Record]:
+    """
+    The records of a log from `pos`, whatever its format, `offset` being where the records start
+    """
+    if isCompact(data, offset):
+        return compactRecords(data, max(pos, offset + len(COMPACT_MAGIC)), width, height)
+    return textRecords(data, pos)
+
+
+def readLog(data: bytes) -> tuple[tuple[int, int, int, int, numpy.ndarray], typing.Iterator[Record]]:
+    """
+    Read a log of either format
+
+    Returns:
+        tuple[tuple[int, int, int, int, numpy.ndarray], typing.Iterator[Record]]: the stage, and its records in order,
+        a Frame, a Snapshot or the line for anything else
+    """
+    stage, offset = splitLog(data)
+    return stage, records(data, offset, offset, stage[0], stage[1])
+
+
+def readIndex(data: bytes) -> tuple[int, dict[int, int]]:
+    """
+    Read the index at the end of a log, only its tail is read
+
+    Returns:
+        tuple[int, dict[int, int]]: the generations between two snapshots, 0 without index, and the position of the
+        snapshot of each generation
+    """
+    values: list[int]
+    if data[-len(INDEX_MAGIC):] == INDEX_MAGIC:
+        pos: int = INDEX_TRAILER.unpack_from(data, len(data) - INDEX_TRAILER.size)[0]
+        interval, pos = readVarint(data, pos + 1)
+        count, pos = readVarint(data, pos)
+        values = decodeVarints(data, pos, 2 * count)[0].tolist()
+    else:
+        start: int = data.rfind(b"\nIndex:") + 1
+        if not start:
+            return 0, {}
+        interval, *values = map(int, bytes(data[start:]).split()[1:])
+    return interval, dict(zip(values[::2], values[1::2]))
+
+
+def encodeIndex(interval: int, index: dict[int, int], pos: int, log_format: LogFormat) -> bytes:
+    """
+    Encode the index of the snapshots, `pos` being where it is written
+    """
+    values: list[int] = [value for item in index.items() for value in item]
+    if log_format == LogFormat.TEXT:
+        return (" ".join(map(str, ["Index:", interval, *values])) + "\n").encode("iso8859")
+    return b"X" + encodeVarints([interval, len(index), *values]) + INDEX_TRAILER.pack(pos, INDEX_MAGIC)
+
+
+def stepCells(cells: numpy.ndarray, moves: numpy.ndarray) -> numpy.ndarray:
+    """
+    One generation of the game as ModuleGame plays it: the rule of the game, then the swap of the cells moved an odd
+    number of times
+    """
+    cells = GoLEngine.nextGeneration(cells, GoLEngine.countNeighbors(cells))
+    if len(moves):
+        cells ^= (numpy.bincount(moves, minlength=cells.size) & 1).astype(bool).reshape(cells.shape)
+    return cells
+
+
+def seekLog(data: bytes, gen: int) -> tuple[tuple[int, int, int, int, numpy.ndarray], numpy.ndarray]:
+    """
+    The cells at the end of the generation `gen`, from the closest snapshot before it, `data` can be a memory map
+    of the log
+
+    Returns:
+        tuple[tuple[int, int, int, int, numpy.ndarray], numpy.ndarray]: the stage, and the (height, width) cells
+    """
+    stage, offset = splitLog(data)
+    width, height = stage[0], stage[1]
+    index: dict[int, int] = readIndex(data)[1]
+    base: int = max((snapshot for snapshot in index if snapshot <= gen), default=-1)
+    cells: numpy.ndarray = stage[4]
+
+    for record in records(data, offset, index.get(base, offset), width, height):
+        if isinstance(record, Snapshot) and record.gen <= gen:
+            cells = record.unpack(width, height)
+            base = record.gen
+        elif isinstance(record, Frame) and base < record.gen <= gen:
+            cells = stepCells(cells, record.moves)
+        elif isinstance(record, Frame) and record.gen > gen:
+            break
+    return stage, cells
+
+
+def toText(src: str, dst: str) -> None:
+    """
+    Rewrite the log `src` into `dst` with text records, the stage is copied as it is and the index rebuilt
+    """
+    with open(src, "rb") as f:
+        data: bytes = f.read()
+    stage, offset = splitLog(data)
+    interval: int = readIndex(data)[0]
+    index: dict[int, int] = {}
+    with open(dst + ".tmp", "wb") as f:
+        f.write(data[:offset])
+        for record in records(data, offset, offset, stage[0], stage[1]):
+            if isinstance(record, str):
+                f.write(encodeLine(record, LogFormat.TEXT))
+            elif isinstance(record, Snapshot):
+                index[record.gen] = f.tell()
+                f.write(encodeSnapshot(record.gen, record.packed, LogFormat.TEXT))
+            else:
+                f.write(encodeFrame(record.gen, record.moves, stage[0], stage[1], LogFormat.TEXT, record.wall, record.cpu))
+        if interval:
+            f.write(encodeIndex(interval, index, f.tell(), LogFormat.TEXT))
+    os.replace(dst + ".tmp", dst)
+
+
+if __name__ == "__main__":
+    toText(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else sys.argv[1])
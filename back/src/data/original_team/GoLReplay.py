@@ -0,0 +1,159 @@
+"""
+Replay the logs of a team and check their scores, without running any code of the team
+
+Each stage log is replayed as ModuleGame plays it, with the packed engine: the rule of the game, then the moves of the
+frame within the moves allowed by GoLGoals.nextMoves. Every score is computed again and compared to the `Score:` lines
+and the snapshots of the log, and to the score of the stage in `all.log`, the logs are replayed by one process each
+
+Usage: python3 GoLReplay.py <logs directory> [--final] [--workers=<n>] [<stage> ...]
+    every stage of `all.log` by default, `--final` only computes the score of the last generation, exits with 1 when a
+    log does not match its replay
+"""
+
+
+import sys
+import mmap
+import dataclasses
+import multiprocessing
+from os import path, cpu_count
+import numpy
+import GoLLib
+import GoLGoals
+import GoLEngine
+import GoLLog
+
+
+MAX_ERRORS: int = 10
+
+
+@dataclasses.dataclass
+class Replay:
+    """
+    The replay of a stage log
+
+    Attributes:
+        name (str): the name of the stage
+        score (int): the score at the end of the last generation
+        errors (list[str]): every difference between the log and its replay, empty when they match
+    """
+    name: str
+    score: int = 0
+    errors: list[str] = dataclasses.field(default_factory=list)
+
+
+def replayLog(name: str, data: bytes, final: bool = False) -> Replay:
+    """
+    Replay the log of a stage, `data` can be a memory map of the log
+
+    With `final`, only the score of the last generation is computed and the `Score:` lines are not checked
+    """
+    res: Replay = Replay(name)
+    (width, height, goal, last_gen, start), records = GoLLog.readLog(data)
+    # Only the generation and the moves left of the stage are used, to count the moves allowed
+    stage: GoLLib.StageData = GoLLib.StageData(width, height, GoLLib.Goal(goal), last_gen, start)
+    cells: GoLEngine.PackedCells = GoLEngine.PackedCells(start)
+    scores: dict[int, int] = {}
+
+    for record in records:
+        if isinstance(record, GoLLog.Frame):
+            if record.gen != stage.gen:
+                res.errors.append(f"frame {record.gen} found instead of the frame {stage.gen}")
+                break
+            if len(record.moves) > stage.moves:
+                res.errors.append(f"frame {record.gen}: {len(record.moves)} moves played with {stage.moves} allowed")
+            if len(record.moves) and (record.moves.min() < 0 or record.moves.max() >= width * height):
+                res.errors.append(f"frame {record.gen}: move out of the grid")
+                break
+            cells.step()
+            if len(record.moves):
+                swapped: numpy.ndarray = GoLEngine.oddCells(record.moves)
+                cells.toggle(swapped // width, swapped % width)
+            stage.moves -= len(record.moves)
+            if not final or stage.gen == last_gen - 1:
+                scores[stage.gen] = GoLGoals.scoreCells(stage.GOAL, numpy.asarray(cells))
+            stage.moves = GoLGoals.nextMoves(stage)
+            stage.gen += 1
+        elif isinstance(record, GoLLog.Snapshot):
+            if record.gen != stage.gen - 1 or record.packed != numpy.packbits(numpy.asarray(cells), axis=None, bitorder="little").tobytes():
+                res.errors.append(f"snapshot {record.gen} differs from the replay")
+        elif record.startswith("Score:") and not final:
+            gen, score = map(int, record.split()[1:3])
+            if scores.get(gen) != score:
+                res.errors.append(f"score {gen}: {score} logged, {scores.get(gen)} replayed")
+
+    if stage.gen != last_gen:
+        res.errors.append(f"the log stops at the generation {stage.gen} of {last_gen}")
+    res.score = scores[last_gen - 1] if last_gen - 1 in scores else GoLGoals.scoreCells(stage.GOAL, numpy.asarray(cells))
+    return res
+
+
+def replayFile(file: str, final: bool = False) -> Replay:
+    """
+    Replay the log file of a stage, named after the file
+    """
+    with open(file, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return replayLog(path.basename(file).removesuffix(".log"), data, final)
+
+
+def readResults(file: str) -> tuple[dict[str, int], int | None]:
+    """
+    Read `all.log`
+
+    Returns:
+        tuple[dict[str, int], int | None]: the score of each stage, and the total if there is one
+    """
+    scores: dict[str, int] = {}
+    total: int | None = None
+    with open(file, "r", encoding="iso8859") as f:
+        for line in f:
+            if line.startswith("Score "):
+                name, score = line[len("Score "):].split(":")
+                scores[name] = int(score)
+            elif line.startswith("Total:"):
+                total = int(line.split()[1])
+    return scores, total
+
+
+def verify(logs_dir: str, names: list[str] | None = None, final: bool = False, workers: int = cpu_count() or 1) -> list[Replay]:
+    """
+    Replay the logs of `names`, every stage of `all.log` by default, and compare them with `all.log`
+    """
+    scores, total = readResults(path.join(logs_dir, "all.log"))
+    files: list[str] = [path.join(logs_dir, f"{name}.log") for name in names or scores]
+    res: list[Replay]
+    if min(workers, len(files)) > 1:
+        with multiprocessing.get_context("fork").Pool(min(workers, len(files))) as pool:
+            res = pool.starmap(replayFile, [(file, final) for file in files])
+    else:
+        res = [replayFile(file, final) for file in files]
+
+    for replay in res:
+        if scores.get(replay.name) != replay.score:
+            replay.errors.append(f"score {scores.get(replay.name)} in all.log, {replay.score} replayed")
+
+    if not names and total is not None and total != sum(replay.score for replay in res):
+        res[-1].errors.append(f"total {total} in all.log, {sum(replay.score for replay in res)} replayed")
+    return res
+
+
+def main(logs_dir: str, names: list[str], final: bool = False, workers: int = cpu_count() or 1) -> int:
+    """
+    Print the replay of every log
+
+    Returns:
+        int: the exit code, 1 when a log does not match its replay
+    """
+    res: list[Replay] = verify(logs_dir, names, final, workers)
+    for replay in res:
+        print(f"{replay.name}: {replay.score} {'OK' if not replay.errors else 'MISMATCH'}")
+        for error in replay.errors[:MAX_ERRORS]:
+            print(f"    {error}")
+        if len(replay.errors) > MAX_ERRORS:
+            print(f"    and {len(replay.errors) - MAX_ERRORS} more")
+    return int(any(replay.errors for replay in res))
+
+
+if __name__ == "__main__":
+    options: dict[str, str] = dict(arg[2:].partition("=")[::2] for arg in sys.argv[2:] if arg.startswith("--"))
+    sys.exit(main(sys.argv[1], [arg for arg in sys.argv[2:] if not arg.startswith("--")], "final" in options, int(options.get("workers") or cpu_count() or 1)))
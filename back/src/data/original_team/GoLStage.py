@@ -0,0 +1,264 @@
+"""
+The Stage file of the game, the stages are either text or binary
+
+Text (`.in`):
+    Dimension: <width> <height>
+    Goal: <goal>
+    Generation: <last generation>
+    then one line of `O` (alive) and `.` (dead) per row
+
+Binary (`.gol`):
+    the header `GoLS`, then width, height, goal and last generation as little-endian uint32,
+    then one row of ceil(width / 8) bytes per row, the cell `w` is the bit `w % 8` of the byte `w // 8`
+
+RLE (`.rle`):
+    the standard Life run length encoding, `x = <width>, y = <height>, rule = B3/S23` then the runs of `b` (dead)
+    and `o` (alive) cells, `$` ending a row and `!` the pattern, the goal and the last generation are the comments
+    `#C Goal: <goal>` and `#C Generation: <last generation>` before the header
+
+Usage: python3 GoLStage.py <source> <destination>, the format of the destination is chosen by its extension
+"""
+
+
+import re
+import sys
+import mmap
+from os import path
+import struct
+import typing
+import numpy
+
+
+MAGIC: bytes = b"GoLS"
+HEADER: struct.Struct = struct.Struct("<4sIIII")
+BINARY_EXTENSION: str = ".gol"
+RLE_EXTENSION: str = ".rle"
+TEXT_EXTENSION: str = ".in"
+EXTENSIONS: tuple[str, ...] = (BINARY_EXTENSION, RLE_EXTENSION, TEXT_EXTENSION)
+RLE_LINE: int = 70
+RLE_HEADER: re.Pattern = re.compile(r"x\s*=\s*(\d+)\s*,\s*y\s*=\s*(\d+)\s*(?:,\s*rule\s*=\s*(\S+))?")
+RLE_COMMENT: re.Pattern = re.compile(r"#C\s*(Goal|Generation):\s*(\d+)", re.IGNORECASE)
+RLE_RUN: re.Pattern = re.compile(r"(\d*)([bo$])")
+RLE_RULES: tuple[str, ...] = ("B3/S23", "23/3")
+SEPARATOR: str = "---------------------------------\n"
+TEXT_BLOCK: int = 1 << 20
+
+
+def isBinary(data: bytes | mmap.mmap) -> bool:
+    """Whether the content of a stage file (or of its log) starts like a binary stage"""
+    return data[:len(MAGIC)] == MAGIC
+
+
+def isRLE(data: str) -> bool:
+    """Whether the content of a stage file (or of its log) starts like a RLE stage"""
+    return data[:1] in ("#", "x")
+
+
+def binarySize(width: int, height: int) -> int:
+    """The size of a binary stage, header included"""
+    return HEADER.size + height * ((width + 7) // 8)
+
+
+def readText(file: typing.BinaryIO) -> tuple[int, int, int, int, numpy.ndarray]:
+    """
+    Read a text stage from `file`, the rows are read by blocks of about TEXT_BLOCK bytes and each block is converted
+    at once, every row must have exactly `width` cells
+
+    Returns:
+        tuple[int, int, int, int, numpy.ndarray]: the width, height, goal, last generation and (height, width) cells
+    """
+    width, height = map(int, file.readline().split(None, 3)[1:3])
+    goal: int = int(file.readline().split(None, 2)[1])
+    last_gen: int = int(file.readline().split(None, 2)[1])
+    cells: numpy.ndarray = numpy.empty((height, width), dtype=bool)
+
+    h: int = 0
+    while h < height:
+        rows: list[bytes] = [row.strip() for row in file.readlines(TEXT_BLOCK)[:height - h]]
+        if not rows:
+            raise ValueError(f"Text stage of {height} rows has only {h} rows")
+        block: bytes = b"".join(rows)
+        if len(block) != len(rows) * width:
+            wrong: int = next(i for i, row in enumerate(rows) if len(row) != width)
+            raise ValueError(f"Row {h + wrong} of the text stage has {len(rows[wrong])} cells instead of {width}")
+        cells[h:h + len(rows)] = numpy.frombuffer(block, dtype=numpy.uint8).reshape((len(rows), width)) == ord('O')
+        h += len(rows)
+
+    return width, height, goal, last_gen, cells
+
+
+def copyStage(src: typing.BinaryIO, dst: typing.BinaryIO) -> None:
+    """
+    Copy a text or RLE stage at the start of its log, by blocks, and end it with the separator
+    """
+    last: bytes = b"\n"
+    while chunk := src.read(TEXT_BLOCK):
+        dst.write(chunk)
+        last = chunk[-1:]
+    if last != b"\n":
+        dst.write(b"\n")
+    dst.write(SEPARATOR.encode("iso8859"))
+
+
+def parseBinary(data: bytes | mmap.mmap) -> tuple[int, int, int, int, numpy.ndarray]:
+    """
+    Read a binary stage, the cells are unpacked straight from `data` which can be a memory map of the file
+
+    Returns:
+        tuple[int, int, int, int, numpy.ndarray]: the width, height, goal, last generation and (height, width) cells
+    """
+    magic, width, height, goal, last_gen = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("Not a binary stage")
+    if len(data) < binarySize(width, height):
+        raise ValueError("Truncated binary stage")
+
+    body: numpy.ndarray = numpy.frombuffer(data, dtype=numpy.uint8, count=height * ((width + 7) // 8), offset=HEADER.size)
+    cells: numpy.ndarray = numpy.unpackbits(body.reshape((height, (width + 7) // 8)), axis=1, count=width, bitorder="little").astype(bool)
+    return width, height, goal, last_gen, cells
+
+
+def parseRLE(data: str) -> tuple[int, int, int, int, numpy.ndarray]:
+    """
+    Read a RLE stage, only the live runs are written in the cells so the time depends on the runs and not on the area
+
+    Returns:
+        tuple[int, int, int, int, numpy.ndarray]: the width, height, goal, last generation and (height, width) cells
+    """
+    fields: dict[str, int] = {}
+    lines: list[str] = data.split("\n")
+    i: int = 0
+    while i < len(lines) and (lines[i].startswith("#") or not lines[i].strip()):
+        comment: re.Match | None = RLE_COMMENT.match(lines[i])
+        if comment:
+            fields[comment[1].capitalize()] = int(comment[2])
+        i += 1
+
+    header: re.Match | None = RLE_HEADER.match(lines[i]) if i < len(lines) else None
+    if header is None:
+        raise ValueError("Missing RLE header")
+    if header[3] and header[3].upper() not in RLE_RULES:
+        raise ValueError(f"Unsupported RLE rule {header[3]}")
+    if "Goal" not in fields or "Generation" not in fields:
+        raise ValueError("Missing the Goal or the Generation comment of the RLE stage")
+    width, height = int(header[1]), int(header[2])
+
+    body: str = "".join("".join(lines[i + 1:]).split()).split("!", 1)[0]
+    cells: numpy.ndarray = numpy.zeros((height, width), dtype=bool)
+    h: int = 0
+    w: int = 0
+    end: int = 0
+    for run in RLE_RUN.finditer(body):
+        if run.start() != end:
+            break
+        end = run.end()
+        count: int = int(run[1]) if run[1] else 1
+        if run[2] == "$":
+            h += count
+            w = 0
+            continue
+        if w + count > width or h >= height:
+            raise ValueError(f"RLE run outside of the {width}x{height} stage")
+        if run[2] == "o":
+            cells[h, w:w + count] = True
+        w += count
+    if end != len(body):
+        raise ValueError(f"Invalid RLE run {body[end:end + 10]!r}")
+    return width, height, fields["Goal"], fields["Generation"], cells
+
+
+def formatText(width: int, height: int, goal: int, last_gen: int, cells: numpy.ndarray) -> str:
+    """Write a text stage"""
+    rows: numpy.ndarray = numpy.where(numpy.asarray(cells, dtype=bool).reshape((height, width)), ord('O'), ord('.')).astype(numpy.uint8)
+    return f"Dimension: {width} {height}\nGoal: {goal}\nGeneration: {last_gen}\n" + "".join(row.tobytes().decode("iso8859") + "\n" for row in rows)
+
+
+def formatBinary(width: int, height: int, goal: int, last_gen: int, cells: numpy.ndarray) -> bytes:
+    """Write a binary stage"""
+    body: numpy.ndarray = numpy.packbits(numpy.asarray(cells, dtype=bool).reshape((height, width)), axis=1, bitorder="little")
+    return HEADER.pack(MAGIC, width, height, goal, last_gen) + body.tobytes()
+
+
+def formatRLE(width: int, height: int, goal: int, last_gen: int, cells: numpy.ndarray) -> str:
+    """Write a RLE stage, the dead runs that end a row are left out"""
+    cells = numpy.asarray(cells, dtype=bool).reshape((height, width))
+    alive: numpy.ndarray = numpy.flatnonzero(cells.any(axis=1))
+    padded: numpy.ndarray = numpy.zeros((len(alive), width + 2), dtype=numpy.int8)
+    padded[:, 1:-1] = cells[alive]
+    edges: numpy.ndarray = numpy.diff(padded, axis=1)
+    rows, starts = numpy.nonzero(edges == 1)
+    ends: numpy.ndarray = numpy.nonzero(edges == -1)[1]
+    rows = alive[rows]
+
+    runs: list[str] = []
+    h: int = 0
+    w: int = 0
+    for row, start, end in zip(rows.tolist(), starts.tolist(), ends.tolist()):
+        if row > h:
+            runs.append(f"{row - h if row - h > 1 else ''}$")
+            h, w = row, 0
+        if start > w:
+            runs.append(f"{start - w if start - w > 1 else ''}b")
+        runs.append(f"{end - start if end - start > 1 else ''}o")
+        w = end
+    runs.append("!")
+
+    lines: list[str] = [f"#C Goal: {goal}", f"#C Generation: {last_gen}", f"x = {width}, y = {height}, rule = {RLE_RULES[0]}"]
+    line: str = ""
+    for run in runs:
+        if len(line) + len(run) > RLE_LINE:
+            lines.append(line)
+            line = ""
+        line += run
+    lines.append(line)
+    return "\n".join(lines) + "\n"
+
+
+def findStage(directory: str, name: str) -> str:
+    """
+    The stage file `name` of the directory, the first found of `.gol`, `.rle` and `.in`, or "" if there is none
+    """
+    for extension in EXTENSIONS:
+        if path.isfile(path.join(directory, name + extension)):
+            return path.join(directory, name + extension)
+    return ""
+
+
+def readStage(file: str) -> tuple[int, int, int, int, numpy.ndarray]:
+    """
+    Read a stage file of either format
+
+    Returns:
+        tuple[int, int, int, int, numpy.ndarray]: the width, height, goal, last generation and (height, width) cells
+    """
+    with open(file, "rb") as f:
+        head: bytes = f.read(len(MAGIC))
+        f.seek(0)
+        if isBinary(head):
+            return parseBinary(f.read())
+        if isRLE(head.decode("iso8859")):
+            return parseRLE(f.read().decode("iso8859"))
+        return readText(f)
+
+
+def writeStage(file: str, width: int, height: int, goal: int, last_gen: int, cells: numpy.ndarray) -> None:
+    """
+    Write a stage file, binary if it ends with `.gol`, RLE if it ends with `.rle`, text otherwise
+    """
+    if file.endswith(BINARY_EXTENSION):
+        with open(file, "wb") as f:
+            f.write(formatBinary(width, height, goal, last_gen, cells))
+    else:
+        with open(file, "w", encoding="iso8859") as f:
+            f.write((formatRLE if file.endswith(RLE_EXTENSION) else formatText)(width, height, goal, last_gen, cells))
+
+
+def convert(src: str, dst: str) -> None:
+    """
+    Convert the stage `src` into `dst`, the format of `dst` is chosen by its extension
+    """
+    writeStage(dst, *readStage(src))
+
+
+if __name__ == "__main__":
+    convert(sys.argv[1], sys.argv[2])
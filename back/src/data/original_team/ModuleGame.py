@@ -4,10 +4,25 @@ The Main file of the game
 
 
 import sys
-from os import path, makedirs, geteuid, seteuid
+import json
+import time
+import types
+import importlib
+import resource
+import tracemalloc
+from os import path, makedirs, geteuid, seteuid, cpu_count
 from pwd import getpwnam
 import signal
+import mmap
+import enum
+import functools
+import multiprocessing
+import concurrent.futures
 import GoLLib
+import GoLEngine
+import GoLGoals
+import GoLStage
+import GoLLog
 import typing
 import numpy
 
@@ -177,24 +192,85 @@ SAFE_BUILTINS: dict[str, typing.Any] = {
 BASE_USER: int = geteuid()
 SAFE_USER: int = getpwnam("player").pw_uid
 PATH: str = path.dirname(path.abspath(__file__))
+FRAME_BUDGET: float = 0.5
+WALL_BUDGET: float = 1.0
+STAGE_BUDGET: float = 20.0
+# The seconds left to a player that caught BudgetExceeded to return, then the timers end the game
+GRACE_BUDGET: float = 0.5
+TIMER_SIGNALS: tuple[signal.Signals, ...] = (signal.SIGALRM, signal.SIGPROF)
 
 
 class Guardian:
     """
     The guardian class
+
+    During a stage the signals of the budget timers are blocked, so a timeout can not stop the guardian between the
+    switch of the user and the one of the lock, `call` only lets them through for the player code
     """
     def __enter__(self: "Guardian") -> None:
+        GoLLib.LOCK.acquire(self)
         seteuid(SAFE_USER)
 
     def __exit__(self: "Guardian", *args: typing.Any) -> None:
         seteuid(BASE_USER)
+        GoLLib.LOCK.release(self)
+
+    @staticmethod
+    def call(function: typing.Callable[..., typing.Any], *args: typing.Any) -> typing.Any:
+        """Call the player code, the timers can interrupt it"""
+        try:
+            signal.pthread_sigmask(signal.SIG_UNBLOCK, TIMER_SIGNALS)
+            return function(*args)
+        finally:
+            signal.pthread_sigmask(signal.SIG_BLOCK, TIMER_SIGNALS)
+
+
+def warmNumpy() -> None:
+    """
+    Let numpy import the modules behind the array methods now,
+    the player can not import anything so its first `stage.grid.view().sum()` would fail
+    """
+    sample: numpy.ndarray = numpy.zeros((2, 2), dtype=bool)
+    for method in ("sum", "prod", "any", "all", "min", "max", "mean", "std", "var"):
+        getattr(sample, method)()
+
+
+# The whitelist of the prelude as the game started, the player can rebind GoLLib.PRELUDE but not this one
+PRELUDE: tuple[str, ...] = GoLLib.PRELUDE
+# The modules of the prelude used by the player, with the seconds their import took, in the order of their first use
+IMPORTS: dict[str, float] = {}
+
+
+def importPrelude(name: str) -> types.ModuleType:
+    """
+    Import a module of the prelude for the lazy proxies of GoLLib, the timers of the budget are paused meanwhile
+
+    The timers are only handled here, the player can reach GoLLib but not the signals
+    """
+    if name not in PRELUDE:
+        raise ImportError(f"{name} is not a module of the prelude")
+    timers: list[tuple[int, float, float]] = [(timer, *signal.setitimer(timer, 0)) for timer in (signal.ITIMER_REAL, signal.ITIMER_PROF)]
+    start: float = time.perf_counter()
+    try:
+        module: types.ModuleType = importlib.import_module(name)
+        IMPORTS.setdefault(name, time.perf_counter() - start)
+    finally:
+        for timer, delay, interval in timers:
+            if delay:
+                signal.setitimer(timer, delay, interval)
+    return module
 
 
+warmNumpy()
+GoLLib.IMPORTER = importPrelude
 with Guardian():
     import ModulePlayer
 ModulePlayer.__builtins__ = SAFE_BUILTINS
 
 
+Neighbor = list[list[int]] | numpy.ndarray | GoLEngine.TiledCells | GoLEngine.ParallelCells | None
+
+
 def countNeighbor(stage: GoLLib.StageData) -> list[list[int]]:
     """Count the number of neighbor that are alive"""
     res: list[list[int]] = [[0]*stage.WIDTH for _ in range(stage.HEIGHT)]
@@ -262,8 +338,8 @@ def countNeighbor(stage: GoLLib.StageData) -> list[list[int]]:
     return res
 
 
-def updateNeighbor(neighbor: list[list[int]], w: int, h: int) -> None:
-    change: int = 1 if not neighbor[h][w] else -1
+def updateNeighbor(neighbor: list[list[int]], w: int, h: int, alive: bool) -> None:
+    change: int = 1 if alive else -1
 
     if h > 0 and w > 0:
         neighbor[h - 1][w - 1] += change
@@ -291,240 +367,650 @@ def actualizeStage(stage: GoLLib.StageData, neighbor: list[list[int]]) -> None:
     h: int
     pos: int
     cnt: int
+    changes: list[int] = []
     for h in range(stage.HEIGHT):
         for w in range(stage.WIDTH):
             pos = w + h * stage.WIDTH
             cnt = neighbor[h][w]
             if stage.grid[pos] and cnt != 2 and cnt != 3:
-                stage.grid[pos] = False
-                updateNeighbor(neighbor, w, h)
+                changes.append(pos)
             elif not stage.grid[pos] and cnt == 3:
-                stage.grid[pos] = True
-                updateNeighbor(neighbor, w, h)
+                changes.append(pos)
 
+    for pos in changes:
+        stage.grid[pos] = not stage.grid[pos]
+        updateNeighbor(neighbor, pos % stage.WIDTH, pos // stage.WIDTH, stage.grid[pos])
 
-def handleTimeout(*args: typing.Any) -> None:
-    raise TimeoutError()
 
+def getCells(stage: GoLLib.StageData) -> numpy.ndarray | GoLEngine.PackedCells:
+    """
+    Get the cells behind the grid of the stage, writable by the engine only
+    """
+    return object.__getattribute__(stage.grid, '__data')
 
-def callPlayer(stage: GoLLib.StageData, neighbor: list[list[int]], log_file: str) -> None:
+
+def setCells(stage: GoLLib.StageData, cells: numpy.ndarray | GoLEngine.PackedCells) -> None:
     """
-    Call the player properly
+    Replace the cells behind the grid of the stage
     """
-    player_action: list[GoLLib.Coord] = []
-    try:
-        with Guardian():
-            signal.signal(signal.SIGALRM, handleTimeout)
-            signal.alarm(5)
-            ModulePlayer.play(stage, player_action)
-            signal.alarm(0)
-    except Exception as e:
-        print(e)
+    object.__setattr__(stage.grid, '__data', cells)
 
-    with open(log_file, "a", encoding="iso8859") as f:
-        f.write(f"Frame: {stage.gen}")
-        for pos in player_action[:stage.moves]:
-            if stage.moves <= 0:
-                break
-            if isinstance(pos, GoLLib.Pos):
-                pos = pos.w + pos.h * stage.WIDTH
-            if pos < 0 or pos >= stage.WIDTH * stage.HEIGHT:
-                continue
-            stage.grid[pos] = not stage.grid[pos]
-            stage.moves -= 1
-            updateNeighbor(neighbor, pos % stage.WIDTH, pos // stage.WIDTH)
-            f.write(f" {pos}")
-        f.write("\n")
 
+def forgetRegions(stage: GoLLib.StageData) -> None:
+    """
+    Drop the copy, the sums and the alive cells kept by the grid, the grid computes them again when the player asks
+    """
+    object.__setattr__(stage.grid, '__view', None)
+    object.__setattr__(stage.grid, '__summed', None)
+    object.__setattr__(stage.grid, '__alive', None)
 
-def actualizeMoves(stage: GoLLib.StageData) -> int:
+
+def shareState(stage: GoLLib.StageData, neighbor: Neighbor) -> None:
     """
-    Actualize the moves
+    Give the player the neighbor counts, they are only copied and the changed cells only computed if the player asks
     """
-    match stage.GOAL:
-        case GoLLib.Goal.MORE | GoLLib.Goal.LESS:
-            return (500 * 500) if (stage.gen >= stage.LAST_GEN - 5) else (stage.moves // 2 + 5)
-        case GoLLib.Goal.ODD | GoLLib.Goal.EVEN:
-            return (500 * 500 // 2) if (stage.gen >= stage.LAST_GEN - 5) else (stage.moves // 2 + 3)
-        case GoLLib.Goal.BORDER:
-            return (500 + 500 + 500 + 500) if (stage.gen >= stage.LAST_GEN - 5) else (15)
-        case GoLLib.Goal.FIX | GoLLib.Goal.CLING:
-            return 30
-        case GoLLib.Goal.YOU:
-            return 30
+    forgetRegions(stage)
+    object.__setattr__(stage, '__changed', None)
+    object.__setattr__(stage, '__neighbor', None)
+    object.__setattr__(stage, '__counts', neighbor if isinstance(neighbor, numpy.ndarray) else None)
 
 
-def getStageData(file: str, log_file: str) -> GoLLib.StageData:
+def countNeighborNumpy(stage: GoLLib.StageData) -> numpy.ndarray:
+    """Count the number of neighbor that are alive with whole-array operations"""
+    return GoLEngine.countNeighbors(getCells(stage))
+
+
+def actualizeStageNumpy(stage: GoLLib.StageData, neighbor: numpy.ndarray) -> None:
+    """
+    Actualize the stage with whole-array operations
+    """
+    cells: numpy.ndarray = getCells(stage)
+    cells[...] = GoLEngine.nextGeneration(cells, neighbor)
+    neighbor[...] = GoLEngine.countNeighbors(cells)
+
+
+def countNeighborPacked(stage: GoLLib.StageData) -> None:
     """
-    Get the stage data
+    Switch the grid to packed cells, the neighbors are counted by the bitwise adder on every step
     """
-    lines: list[str]
-    with open(file, "r", encoding="iso8859") as f:
-        lines = f.readlines()
+    setCells(stage, GoLEngine.PackedCells(getCells(stage)))
 
-    with open(log_file, "w", encoding="iso8859") as log:
-        log.write("")
-        for line in lines:
-            log.write(line)
-        log.write("---------------------------------\n")
 
-    width, height = map(int, lines[0].split(None, 3)[1:3])
-    goal: int = int(lines[1].split(None, 2)[1])
-    last_gen: int = int(lines[2].split(None, 2)[1])
-    grid: list[bool] = [False] * (width * height)
+def actualizeStagePacked(stage: GoLLib.StageData, neighbor: None) -> None:
+    """
+    Actualize the stage 64 cells at a time
+    """
+    getCells(stage).step()
 
-    for h in range(height):
-        line = lines[h + 3].strip()
-        for w in range(width):
-            grid[w + h * width] = line[w] == 'O'
 
-    return GoLLib.StageData(width, height, GoLLib.Goal(goal), last_gen, grid)
+def countNeighborTiled(stage: GoLLib.StageData) -> GoLEngine.TiledCells:
+    """
+    Split the grid into tiles, the grid then views the cells of the tiles
+    """
+    tiles: GoLEngine.TiledCells = GoLEngine.TiledCells(getCells(stage))
+    setCells(stage, tiles.cells)
+    return tiles
 
 
-def maximumBorder(stage: GoLLib.StageData) -> int:
-    res: int = 0
-    for i in range(5):
-        res += (5 - i) * 2 * ((stage.WIDTH - 2 * i) + (stage.HEIGHT - 2 * i) - 2)
-    return res
+def actualizeStageTiled(stage: GoLLib.StageData, tiles: GoLEngine.TiledCells) -> int:
+    """
+    Actualize the active tiles of the stage, returns how many of them were recomputed
+    """
+    return tiles.step()
+
+
+def countNeighborParallel(stage: GoLLib.StageData, workers: int = cpu_count() or 1) -> GoLEngine.ParallelCells:
+    """
+    Move the grid into shared memory, split in bands of rows between worker processes
+    """
+    parallel: GoLEngine.ParallelCells = GoLEngine.ParallelCells(getCells(stage), workers)
+    setCells(stage, parallel.cells)
+    return parallel
+
+
+def actualizeStageParallel(stage: GoLLib.StageData, parallel: GoLEngine.ParallelCells) -> None:
+    """
+    Actualize the stage with every worker process, one band each
+    """
+    parallel.step()
+    setCells(stage, parallel.cells)
+
+
+def saveState(stage: GoLLib.StageData, neighbor: Neighbor) -> tuple[bytes, tuple[typing.Any, typing.Any]]:
+    """
+    Copy the state of the engine, along with the key of the grid for the cycle detection
+    """
+    cells: numpy.ndarray | GoLEngine.PackedCells = getCells(stage)
+    key: bytes = cells.words.tobytes() if isinstance(cells, GoLEngine.PackedCells) else cells.tobytes()
+    saved: typing.Any = None
+    if isinstance(neighbor, list):
+        saved = [row.copy() for row in neighbor]
+    elif isinstance(neighbor, numpy.ndarray):
+        saved = neighbor.copy()
+    return key, (cells.copy(), saved)
+
 
+def loadState(stage: GoLLib.StageData, neighbor: Neighbor, state: tuple[typing.Any, typing.Any]) -> None:
+    """
+    Restore the state of the engine saved by `saveState`
+    """
+    cells: numpy.ndarray | GoLEngine.PackedCells = getCells(stage)
+    if isinstance(cells, GoLEngine.PackedCells):
+        cells.words[...] = state[0].words
+    else:
+        cells[...] = state[0]
+
+    if isinstance(neighbor, list):
+        for row, saved in zip(neighbor, state[1]):
+            row[:] = saved
+    elif isinstance(neighbor, numpy.ndarray):
+        neighbor[...] = state[1]
+    elif isinstance(neighbor, GoLEngine.TiledCells):
+        neighbor.dirty[...] = True
+
+
+class Engine(enum.StrEnum):
+    """The engine used to compute the generations"""
+    REFERENCE = "reference"
+    NUMPY = "numpy"
+    PACKED = "packed"
+    TILED = "tiled"
+    PARALLEL = "parallel"
+
+
+ENGINES: dict[Engine, tuple[typing.Callable[[GoLLib.StageData], typing.Any], typing.Callable[[GoLLib.StageData, typing.Any], int | None]]] = {
+    Engine.REFERENCE: (countNeighbor, actualizeStage),
+    Engine.NUMPY: (countNeighborNumpy, actualizeStageNumpy),
+    Engine.PACKED: (countNeighborPacked, actualizeStagePacked),
+    Engine.TILED: (countNeighborTiled, actualizeStageTiled),
+    Engine.PARALLEL: (countNeighborParallel, actualizeStageParallel)
+}
 
-def calculateBorder(stage: GoLLib.StageData) -> float:
-    percent: float = 0
-    for i in range(5):
-        for w in range(i, stage.WIDTH - i):
-            percent += (5 - i) * stage.grid[w + i * stage.WIDTH]
-            percent += (5 - i) * stage.grid[w + (stage.HEIGHT - i - 1) * stage.WIDTH]
-        for h in range(i + 1, stage.HEIGHT - i - 1):
-            percent += (5 - i) * stage.grid[i + h * stage.WIDTH]
-            percent += (5 - i) * stage.grid[stage.WIDTH - i - 1 + h * stage.WIDTH]
-    percent /= maximumBorder(stage)
-    return percent
+
+class BudgetExceeded(BaseException):
+    """
+    Raised in the player code when its time is over, not an Exception so that `except Exception` lets it through
+    """
 
 
-def maximumFix(stage: GoLLib.StageData) -> int:
-    return (1 + (stage.WIDTH - 4) // 3 + ((stage.WIDTH - 4) % 3 == 2)) * (1 + (stage.HEIGHT - 4) // 3 + ((stage.HEIGHT - 4) % 3 == 2))
+class Budget:
+    """
+    The time of the player in a stage
+
+    Each call can use FRAME seconds of CPU, counted by ITIMER_PROF for the whole process, and WALL seconds of wall
+    clock, counted by ITIMER_REAL for a player that waits without computing, the calls of the stage can use STAGE
+    seconds of each in total\n
+    The imports of the prelude do not count, importPrelude pauses the timers while it imports\n
+    A timer raises BudgetExceeded once, a player that catches it has GRACE seconds of each left to return, after that
+    the timers are no longer handled and their signals end the process, even inside a call to C code
+
+    Attributes:
+        FRAME (const float): the CPU seconds of one call
+        WALL (const float): the wall seconds of one call
+        STAGE (const float): the CPU and the wall seconds of all the calls of the stage
+        GRACE (const float): the CPU and the wall seconds left to return after BudgetExceeded
+        wall (float): the wall seconds used in the stage
+        cpu (float): the CPU seconds used in the stage
+        timeouts (int): the calls stopped by a timer
+    """
+    def __init__(self: "Budget", frame: float = FRAME_BUDGET, wall: float = WALL_BUDGET, stage: float = STAGE_BUDGET, grace: float = GRACE_BUDGET) -> None:
+        self.FRAME: float = frame
+        self.WALL: float = wall
+        self.STAGE: float = stage
+        self.GRACE: float = grace
+        self.wall: float = 0
+        self.cpu: float = 0
+        self.timeouts: int = 0
+        self.__running: bool = False
+        self.__start: tuple[float, float, float] = (0, 0, 0)
+
+    def left(self: "Budget") -> bool:
+        """Whether the player has time left in the stage"""
+        return self.wall < self.STAGE and self.cpu < self.STAGE
+
+    def start(self: "Budget") -> None:
+        """Arm the timers for one call"""
+        signal.signal(signal.SIGPROF, self.__timeout)
+        signal.signal(signal.SIGALRM, self.__timeout)
+        self.__start = (time.perf_counter(), time.process_time(), sum(IMPORTS.values()))
+        self.__running = True
+        signal.setitimer(signal.ITIMER_PROF, min(self.FRAME, self.STAGE - self.cpu))
+        signal.setitimer(signal.ITIMER_REAL, min(self.WALL, self.STAGE - self.wall))
+
+    def stop(self: "Budget") -> tuple[float, float]:
+        """
+        Disarm the timers
+
+        Returns:
+            tuple[float, float]: the wall and the CPU seconds of the call, without the imports of the prelude
+        """
+        self.__running = False
+        signal.setitimer(signal.ITIMER_PROF, 0)
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        # A timer that expired outside of the player code is still pending, it must not stop the next call
+        for sig in signal.sigpending() & set(TIMER_SIGNALS):
+            signal.sigwait({sig})
+        imports: float = sum(IMPORTS.values()) - self.__start[2]
+        wall: float = max(0.0, time.perf_counter() - self.__start[0] - imports)
+        cpu: float = max(0.0, time.process_time() - self.__start[1] - imports)
+        self.wall += wall
+        self.cpu += cpu
+        return wall, cpu
+
+    def __timeout(self: "Budget", *args: typing.Any) -> None:
+        # Only once per call, and never after the call
+        if self.__running:
+            self.__running = False
+            self.timeouts += 1
+            # The player can still catch it with `except BaseException`, it must not run for ever
+            for sig in TIMER_SIGNALS:
+                signal.signal(sig, signal.SIG_DFL)
+            signal.setitimer(signal.ITIMER_PROF, self.GRACE)
+            signal.setitimer(signal.ITIMER_REAL, self.GRACE)
+            raise BudgetExceeded(f"Over the time budget of the player, {self.FRAME} s of CPU and {self.WALL} s per generation, {self.STAGE} s per stage")
+
+
+def moveIndex(stage: GoLLib.StageData, pos: typing.Any) -> int:
+    """The cell swapped by a move as `w + h * WIDTH`, -1 when it is not a cell of the grid"""
+    if isinstance(pos, GoLLib.Pos):
+        pos = pos.w + pos.h * stage.WIDTH
+    if not isinstance(pos, int | numpy.integer) or pos < 0 or pos >= stage.WIDTH * stage.HEIGHT:
+        return -1
+    return int(pos)
+
+
+def getMoves(stage: GoLLib.StageData, player_action: list[typing.Any]) -> numpy.ndarray:
+    """
+    Turn the moves of the player into the cells to swap, in order
 
+    Only the first `stage.moves` moves count, the ones out of the grid are skipped
 
-def calculateFix(stage: GoLLib.StageData) -> float:
-    data_array = numpy.zeros((stage.HEIGHT + 2, stage.WIDTH + 2), dtype=bool)
-    data_array[1:-1, 1:-1] = numpy.array([stage.grid[w + h * stage.WIDTH] for w in range(stage.WIDTH) for h in range(stage.HEIGHT)]).reshape((stage.HEIGHT, stage.WIDTH))
-    patern_array = numpy.zeros((4, 4), dtype=bool)
-    patern_array[1:-1, 1:-1] = numpy.ones((2, 2), dtype=bool)
+    Returns:
+        numpy.ndarray: the cells to swap as `w + h * WIDTH`, duplicates included
+    """
+    if stage.moves <= 0:
+        return numpy.zeros(0, dtype=numpy.int64)
 
-    data_rows, data_cols = data_array.shape
-    patern_rows, patern_cols = patern_array.shape
+    action: list[typing.Any] = player_action[:stage.moves]
+    played: numpy.ndarray
+    try:
+        played = numpy.array(action)
+    except ValueError:
+        played = numpy.zeros(0, dtype=object)
+    if played.ndim != 1 or played.dtype.kind not in "iu":
+        played = numpy.fromiter((moveIndex(stage, pos) for pos in action), dtype=numpy.int64, count=len(action))
+    return played[(played >= 0) & (played < stage.WIDTH * stage.HEIGHT)].astype(numpy.int64, copy=False)
 
-    percent: float = 0
 
-    for i in range(data_rows - patern_rows + 1):
-        for j in range(data_cols - patern_cols + 1):
-            if numpy.array_equal(data_array[j:j + patern_cols, i:i + patern_rows], patern_array):
-                percent += 1
+def applyMoves(stage: GoLLib.StageData, neighbor: Neighbor, played: numpy.ndarray) -> None:
+    """
+    Swap all the cells played at once, a cell played twice is swapped back
 
-    percent /= maximumFix(stage)
-    return percent
+    Only the swapped cells and their neighbors are touched, the cost follows the number of moves and not the grid
+    """
+    stage.moves -= len(played)
+    if not len(played):
+        return
+
+    flat: numpy.ndarray = GoLEngine.oddCells(played)
+    h: numpy.ndarray = flat // stage.WIDTH
+    w: numpy.ndarray = flat % stage.WIDTH
+    cells: numpy.ndarray | GoLEngine.PackedCells = getCells(stage)
+    if isinstance(cells, GoLEngine.PackedCells):
+        cells.toggle(h, w)
+        return
+    cells[h, w] ^= True
+
+    if isinstance(neighbor, GoLEngine.TiledCells):
+        neighbor.mark(h, w)
+    elif isinstance(neighbor, numpy.ndarray) and 8 * len(flat) > neighbor.size:
+        neighbor[...] = GoLEngine.countNeighbors(cells)
+    elif isinstance(neighbor, numpy.ndarray):
+        GoLEngine.scatterNeighbors(neighbor, flat, numpy.where(cells[h, w], 1, -1))
+    elif isinstance(neighbor, list):
+        for pos in flat.tolist():
+            updateNeighbor(neighbor, pos % stage.WIDTH, pos // stage.WIDTH, bool(cells[pos // stage.WIDTH, pos % stage.WIDTH]))
+
+
+class Memory(enum.StrEnum):
+    """How the memory of the player is measured"""
+    RSS = "rss"
+    TRACE = "trace"
+
+
+class Perf:
+    """
+    The performance of the player in a stage, for `perf.json`
+
+    One record per call: the wall and CPU seconds of the player, the peak of its memory in bytes, the moves it played,
+    the seconds the engine took to apply them, and whether a timer stopped it\n
+    With Memory.TRACE the peak is the one of the Python allocations during the call, traced by tracemalloc which slows
+    the player down and counts in its budget\n
+    With Memory.RSS it is the peak resident memory of the call above the memory of the process when it started: the
+    peak of the process is reset before each call through /proc/self/clear_refs, where it can not be reset it is only
+    how much the call raised the peak of the process so far
+
+    Attributes:
+        MEMORY (const Memory): how the memory is measured
+        calls (list[dict[str, typing.Any]]): the record of every call
+    """
+    def __init__(self: "Perf", memory: Memory = Memory.RSS) -> None:
+        self.MEMORY: Memory = Memory(memory)
+        self.calls: list[dict[str, typing.Any]] = []
+        self.__base: int = 0
+        self.__reset: bool = True
+
+    def start(self: "Perf") -> None:
+        """Start measuring the memory of a call"""
+        if self.MEMORY == Memory.TRACE:
+            tracemalloc.start()
+            return
+        if self.__reset:
+            try:
+                with open("/proc/self/clear_refs", "w", encoding="ascii") as file:
+                    file.write("5")
+            except OSError:
+                self.__reset = False
+        self.__base = self.__rss()[1 if self.__reset else 0]
+
+    def peak(self: "Perf") -> int:
+        """Stop measuring the memory of a call, returns its peak in bytes"""
+        if self.MEMORY == Memory.TRACE:
+            peak: int = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            return peak
+        return max(0, self.__rss()[0] - self.__base)
+
+    def __rss(self: "Perf") -> tuple[int, int]:
+        """The peak and the current resident memory of the process in bytes, the current one only where /proc is"""
+        if self.__reset:
+            with open("/proc/self/status", "r", encoding="ascii") as file:
+                fields: dict[str, str] = dict(line.split(":", 1) for line in file if ":" in line)
+            return int(fields["VmHWM"].split()[0]) * 1024, int(fields["VmRSS"].split()[0]) * 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024, 0
+
+    def record(self: "Perf", gen: int, wall: float, cpu: float, memory: int, moves: int, apply: float, timeout: bool) -> None:
+        """Add the record of a call"""
+        self.calls.append({"gen": gen, "wall": round(wall, 6), "cpu": round(cpu, 6), "memory": memory, "moves": moves, "apply": round(apply, 6), "timeout": timeout})
+
+    def report(self: "Perf") -> dict[str, typing.Any]:
+        """The totals of the stage, then the record of every call"""
+        return {
+            "calls": len(self.calls),
+            "wall": round(sum(call["wall"] for call in self.calls), 6),
+            "cpu": round(sum(call["cpu"] for call in self.calls), 6),
+            "memory": max((call["memory"] for call in self.calls), default=0),
+            "moves": sum(call["moves"] for call in self.calls),
+            "apply": round(sum(call["apply"] for call in self.calls), 6),
+            "timeouts": sum(call["timeout"] for call in self.calls),
+            "generations": self.calls
+        }
+
+
+def callPlayer(stage: GoLLib.StageData, neighbor: Neighbor, log: GoLLog.LogWriter, budget: Budget, perf: Perf) -> tuple[int, bool]:
+    """
+    Call the player properly, within its time budget
 
+    Returns:
+        tuple[int, bool]: the number of moves applied, and whether the player declared itself idle or has no time
+        left in the stage
+    """
+    if not budget.left():
+        print(f"No time left for the player at the generation {stage.gen}")
+        log.frame(stage.gen)
+        return 0, True
 
-def maximumCling(stage: GoLLib.StageData) -> int:
-    return (1 + (stage.WIDTH - 5) // 4 + ((stage.WIDTH - 5) % 4 == 3)) * (1 + (stage.HEIGHT - 5) // 4 + ((stage.HEIGHT - 5) % 4 == 3))
+    player_action: list[GoLLib.Coord] = []
+    idle: bool = False
+    moves: int = stage.moves
+    played: numpy.ndarray = numpy.zeros(0, dtype=numpy.int64)
+    timeouts: int = budget.timeouts
+    shareState(stage, neighbor)
+    # The CPU timer counts the whole process, the writer must not encode the previous records while the player plays
+    log.flush()
+    perf.start()
+    budget.start()
+    try:
+        try:
+            with Guardian():
+                idle = Guardian.call(ModulePlayer.play, stage, player_action) is GoLLib.IDLE
+        except (Exception, BudgetExceeded) as e:
+            print(e)
 
+        # The moves may be objects of the player, read them under the guardian too
+        with Guardian():
+            played = Guardian.call(getMoves, stage, player_action)
+    except (Exception, BudgetExceeded) as e:
+        print(e)
+    finally:
+        wall, cpu = budget.stop()
+        memory: int = perf.peak()
+    start: float = time.perf_counter()
+    applyMoves(stage, neighbor, played)
+    perf.record(stage.gen, wall, cpu, memory, len(played), time.perf_counter() - start, budget.timeouts > timeouts)
+    log.frame(stage.gen, played, wall, cpu)
+    return moves - stage.moves, idle
 
-def calculateCling(stage: GoLLib.StageData) -> float:
-    data_array = numpy.zeros((stage.HEIGHT + 2, stage.WIDTH + 2), dtype=bool)
-    data_array[1:-1, 1:-1] = numpy.array([stage.grid[w + h * stage.WIDTH] for w in range(stage.WIDTH) for h in range(stage.HEIGHT)]).reshape((stage.HEIGHT, stage.WIDTH))
-    patern_array_1 = numpy.array([
-        [False, False, False, False, False],
-        [False, False, False, False, False],
-        [False, True, True, True, False],
-        [False, False, False, False, False],
-        [False, False, False, False, False]
-    ], dtype=bool)
-    patern_array_2 = numpy.array([
-        [False, False, False, False, False],
-        [False, False, True, False, False],
-        [False, False, True, False, False],
-        [False, False, True, False, False],
-        [False, False, False, False, False]
-    ], dtype=bool)
 
-    data_rows, data_cols = data_array.shape
-    patern_rows, patern_cols = patern_array_1.shape
+def actualizeMoves(stage: GoLLib.StageData) -> int:
+    """
+    Actualize the moves, as the goal of the stage schedules them
+    """
+    return GoLGoals.nextMoves(stage)
 
-    percent: float = 0
 
-    for i in range(data_rows - patern_rows + 1):
-        for j in range(data_cols - patern_cols + 1):
-            if numpy.array_equal(data_array[j:j + patern_cols, i:i + patern_rows], patern_array_1):
-                percent += 1
-            elif numpy.array_equal(data_array[j:j + patern_cols, i:i + patern_rows], patern_array_2):
-                percent += 1
+def getStageData(file: str, log_file: str) -> GoLLib.StageData:
+    """
+    Get the stage data, from a text, RLE or binary stage
 
-    percent /= maximumFix(stage)
-    return percent
+    The log starts with a copy of the stage file, in its own format
+    """
+    with open(file, "rb") as f:
+        head: bytes = f.read(len(GoLStage.MAGIC))
+        if GoLStage.isBinary(head):
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                width, height, goal, last_gen, cells = GoLStage.parseBinary(data)
+                with open(log_file, "wb") as log:
+                    log.write(data[:GoLStage.binarySize(width, height)])
+                    log.write(GoLStage.SEPARATOR.encode("iso8859"))
+            return GoLLib.StageData(width, height, GoLLib.Goal(goal), last_gen, cells)
+
+        f.seek(0)
+        with open(log_file, "wb") as log:
+            GoLStage.copyStage(f, log)
+
+        f.seek(0)
+        if GoLStage.isRLE(head.decode("iso8859")):
+            width, height, goal, last_gen, cells = GoLStage.parseRLE(f.read().decode("iso8859"))
+        else:
+            width, height, goal, last_gen, cells = GoLStage.readText(f)
+    return GoLLib.StageData(width, height, GoLLib.Goal(goal), last_gen, cells)
 
 
 def calculateResult(stage: GoLLib.StageData) -> int:
-    percent: float
-    match stage.GOAL:
-        case GoLLib.Goal.MORE | GoLLib.Goal.LESS:
-            percent = sum(stage.grid) if (stage.GOAL == GoLLib.Goal.MORE) else (stage.WIDTH * stage.HEIGHT - sum(stage.grid))
-            percent /= (stage.WIDTH * stage.HEIGHT)
-        case GoLLib.Goal.ODD | GoLLib.Goal.EVEN:
-            percent = sum(v for i, v in enumerate(stage.grid) if ((i % 2) == (stage.GOAL == GoLLib.Goal.ODD)))
-            percent *= 2
-            percent /= (stage.WIDTH * stage.HEIGHT)
-        case GoLLib.Goal.BORDER: percent = calculateBorder(stage)
-        case GoLLib.Goal.FIX:    percent = calculateFix(stage)
-        case GoLLib.Goal.CLING:  percent = calculateCling(stage)
-        case GoLLib.Goal.YOU:    percent = 0
-    res: int = round(percent * 1_000_000)
-    return res
+    return GoLGoals.scoreCells(stage.GOAL, numpy.asarray(getCells(stage)))
 
 
-def main(stages: list[int]) -> None:
+class StageResult(typing.NamedTuple):
+    """
+    The result of a stage
+
+    Attributes:
+        name (str): the name of the stage
+        score (int): the score of the stage
+        imports (dict[str, float]): the modules of the prelude imported so far, with the seconds of their import
+        perf (dict[str, typing.Any]): the performance of the player, see Perf.report
+    """
+    name: str
+    score: int
+    imports: dict[str, float]
+    perf: dict[str, typing.Any]
+
+
+def playStage(stage_id: int, engine: Engine = Engine.NUMPY, workers: int = cpu_count() or 1, log_format: GoLLog.LogFormat = GoLLog.LogFormat.TEXT, snapshots: int = GoLLog.SNAPSHOT_INTERVAL, budget: tuple[float, float, float] = (FRAME_BUDGET, WALL_BUDGET, STAGE_BUDGET), memory: Memory = Memory.RSS) -> StageResult | None:
+    """
+    Play one stage and write its log
+
+    Returns:
+        StageResult | None: the result of the stage, None when there is no such stage
+    """
+    file_name: str = GoLLib.Goal(stage_id).name.lower()
+    file_path: str = GoLStage.findStage(f"{PATH}/stages", file_name)
+    log_file: str = path.join(f"{PATH}/logs", file_name + ".log")
+
+    if not path.isfile(file_path):
+        return None
+
+    active: int | None
+    moved: int
+    scores: list[int]
+    states: list[numpy.ndarray]
+    log: GoLLog.LogWriter
+    count_neighbor, actualize_stage = ENGINES[Engine(engine)]
+    if Engine(engine) == Engine.PARALLEL:
+        count_neighbor = functools.partial(countNeighborParallel, workers=workers)
+
+    stage: GoLLib.StageData = getStageData(file_path, log_file)
+    neighbor: Neighbor = count_neighbor(stage)
+    cycle: GoLEngine.CycleDetector = GoLEngine.CycleDetector()
+    player: Budget = Budget(*budget)
+    perf: Perf = Perf(memory)
+    idle: bool = False
+
+    # Blocked before the writer thread starts, so it inherits the mask and the timers never interrupt the guardian
+    signal.pthread_sigmask(signal.SIG_BLOCK, TIMER_SIGNALS)
+    with GoLLog.LogWriter(log_file, stage.WIDTH, stage.HEIGHT, log_format, snapshots) as log:
+        while stage.gen < stage.LAST_GEN:
+            if cycle.period:
+                loadState(stage, neighbor, cycle.skip())
+            else:
+                active = actualize_stage(stage, neighbor)
+                if active is not None:
+                    log.line(f"Active: {stage.gen} {active}")
+
+            if idle and cycle.period:
+                # The scores repeat with the cycle, only compute one period of them
+                scores = [calculateResult(stage)]
+                states = [numpy.array(getCells(stage))]
+                while len(scores) < min(cycle.period, stage.LAST_GEN - stage.gen):
+                    loadState(stage, neighbor, cycle.skip())
+                    scores.append(calculateResult(stage))
+                    states.append(numpy.array(getCells(stage)))
+                if stage.LAST_GEN - stage.gen > len(scores):
+                    loadState(stage, neighbor, cycle.skip(stage.LAST_GEN - stage.gen - len(scores) - 1))
+                for i in range(stage.LAST_GEN - stage.gen):
+                    log.frame(stage.gen)
+                    log.line(f"Score: {stage.gen} {scores[i % len(scores)]}")
+                    log.snapshot(stage.gen, states[i % len(states)])
+                    stage.moves = actualizeMoves(stage)
+                    stage.gen += 1
+                break
+
+            if idle:
+                moved = 0
+                log.frame(stage.gen)
+            else:
+                moved, idle = callPlayer(stage, neighbor, log, player, perf)
+            log.line(f"Score: {stage.gen} {calculateResult(stage)}")
+            log.snapshot(stage.gen, numpy.asarray(getCells(stage)))
+
+            if moved:
+                cycle.reset()
+            elif not cycle.period:
+                cycle.push(*saveState(stage, neighbor))
+            stage.moves = actualizeMoves(stage)
+            stage.gen += 1
+
+    res: int = calculateResult(stage)
+    if isinstance(neighbor, GoLEngine.ParallelCells):
+        neighbor.close()
+    return StageResult(file_name, res, dict(IMPORTS), perf.report())
+
+
+def main(stages: list[int], engine: Engine = Engine.NUMPY, workers: int = cpu_count() or 1, log_format: GoLLog.LogFormat = GoLLog.LogFormat.TEXT, snapshots: int = GoLLog.SNAPSHOT_INTERVAL, jobs: int = 1, budget: tuple[float, float, float] = (FRAME_BUDGET, WALL_BUDGET, STAGE_BUDGET), memory: Memory = Memory.RSS) -> None:
     """
     The main function of the game
+
+    With more than one job, the stages are played by that many forked processes, each with its own guardian and timer,
+    and their scores are still written to `all.log` in the order of `stages`\n
+    The performance of the player is written to `perf.json` next to it: the budget, the modules of the prelude it
+    used with the seconds of their import, and for each stage the totals and the record of every call (see Perf)
+
+    Args:
+        stages (list[int]): the ids of the stages to play
+        engine (Engine): the engine used to compute the generations
+        workers (int): the number of processes of the parallel engine
+        log_format (GoLLog.LogFormat): the format of the records of the stage logs
+        snapshots (int): the generations between two snapshots of the cells in the stage logs at least, 0 for none
+        jobs (int): the number of stages played at the same time
+        budget (tuple[float, float, float]): the CPU and the wall seconds of the player per generation, and its
+            seconds per stage, see Budget
+        memory (Memory): how the memory of the player is measured
     """
-    stage_dir: str = f"{PATH}/stages"
     logs_dir: str = f"{PATH}/logs"
     all_logs_file: str = f"{logs_dir}/all.log"
+    perf_file: str = f"{logs_dir}/perf.json"
 
     makedirs(logs_dir, mode=755, exist_ok=True)
     with open(all_logs_file, "w", encoding="iso8859") as file:
         file.write("")
 
     result: int = 0
+    imports: dict[str, float] = {}
+    perf: dict[str, dict[str, typing.Any]] = {}
+    play: typing.Callable[[int], StageResult | None] = functools.partial(playStage, engine=engine, workers=workers, log_format=log_format, snapshots=snapshots, budget=budget, memory=memory)
+    played: typing.Iterable[StageResult | None]
+    executor: concurrent.futures.Executor | None = None
+    if min(jobs, len(stages)) > 1:
+        # Not a multiprocessing pool, its daemon processes could not start the workers of the parallel engine
+        executor = concurrent.futures.ProcessPoolExecutor(min(jobs, len(stages)), mp_context=multiprocessing.get_context("fork"))
+        played = executor.map(play, stages)
+    else:
+        played = map(play, stages)
 
-    file_name: str
-    log_file: str
-    stage: GoLLib.StageData
-    neighbor: list[list[int]]
-    res_tmp: int
-    for stage_id in stages:
-        file_name = GoLLib.Goal(stage_id).name.lower()
-        file_path = path.join(stage_dir, file_name + ".in")
-        log_file = path.join(logs_dir, file_name + ".log")
-
-        if not path.isfile(file_path):
-            continue
-
-        stage = getStageData(file_path, log_file)
-        neighbor = countNeighbor(stage)
-
-        while stage.gen < stage.LAST_GEN:
-            actualizeStage(stage, neighbor)
-            callPlayer(stage, neighbor, log_file)
-            stage.moves = actualizeMoves(stage)
-            stage.gen += 1
-
-        res_tmp = calculateResult(stage)
-        with open(all_logs_file, "a", encoding="iso8859") as file:
-            file.write(f"Score {file_name}: {res_tmp}\n")
-        result += res_tmp
+    try:
+        for res in played:
+            if res is None:
+                continue
+            with open(all_logs_file, "a", encoding="iso8859") as file:
+                file.write(f"Score {res.name}: {res.score}\n")
+            result += res.score
+            for name, seconds in res.imports.items():
+                imports.setdefault(name, seconds)
+            perf[res.name] = res.perf
+    finally:
+        if executor is not None:
+            executor.shutdown()
 
     with open(all_logs_file, "a", encoding="iso8859") as file:
         file.write(f"Total: {result}\n")
+    with open(perf_file, "w", encoding="utf-8") as file:
+        json.dump({
+            "budget": dict(zip(("frame", "wall", "stage"), budget)),
+            "memory": Memory(memory),
+            "imports": {
+                "used": {name: round(seconds, 6) for name, seconds in imports.items()},
+                "unused": [name for name in PRELUDE if name not in imports]
+            },
+            "stages": perf
+        }, file, indent=1)
+
+
+def parseArgs(argv: list[str]) -> tuple[list[int], dict[str, str]]:
+    """
+    Split the command line into stage ids and `--name=value` options
+    """
+    stages: list[int] = []
+    options: dict[str, str] = {}
+    for arg in argv:
+        if arg.startswith("--"):
+            name, _, value = arg[2:].partition("=")
+            options[name] = value
+        else:
+            stages.append(int(arg))
+    return stages, options
 
 
 if __name__ == "__main__":
-    main(list(map(int, sys.argv[1:])))
+    args, options = parseArgs(sys.argv[1:])
+    main(args, Engine(options.get("engine", Engine.NUMPY)), int(options.get("workers", cpu_count() or 1)), GoLLog.LogFormat(options.get("log", GoLLog.LogFormat.TEXT)), int(options.get("snapshots", GoLLog.SNAPSHOT_INTERVAL)), int(options.get("jobs", 1)), (float(options.get("frame-budget", FRAME_BUDGET)), float(options.get("wall-budget", WALL_BUDGET)), float(options.get("stage-budget", STAGE_BUDGET))), Memory(options.get("memory", Memory.RSS)))
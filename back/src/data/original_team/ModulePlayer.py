@@ -7,6 +7,7 @@ def play(stage: GoLLib.StageData, played: list[GoLLib.Coord]) -> None:
     """
     The function to play the game
     You must return a list of Coord for cells to edit (-1 for no cell)
+    You can return GoLLib.IDLE once you will not play anymore in this stage
 
     Args:
         stage (StageData): the stage to play
@@ -0,0 +1,205 @@
+"""
+A pool of warm sandbox workers, to play the submissions without starting a container and an interpreter for each one
+
+The server imports the modules of the ModulePlayer prelude and the game library once, then forks the workers. A worker
+forks a new child for each submission it accepts, so every submission starts from the same warm and clean state. The
+child leaves the session and the groups of the worker, limits its resources, and runs the ModuleGame of the team
+directory; the game itself still switches to the player user around the player code with its guardian.
+
+Started on the host, the pool is a local stand-in for the containers. In production it runs inside one long-lived
+`secure-python-runner` container, with the teams directory and the socket mounted, and runner.py uses it when
+POOL_SOCKET is set.
+
+A request is one JSON message `{"team": <team directory>, "args": [<ModuleGame argument>, ...], "timeout": <seconds>}`,
+answered by `{"code": <exit code>, "output": <stdout and stderr>, "seconds": <time of the child>}`
+
+Usage:
+    python3 pool.py serve <socket> [--workers=<n>] [--preload=<original_team directory>]
+    python3 pool.py play <socket> <team directory> [<ModuleGame argument> ...]
+"""
+
+
+import sys
+import os
+import json
+import time
+import select
+import signal
+import runpy
+import typing
+import resource
+import importlib
+import traceback
+import multiprocessing
+import multiprocessing.connection
+from os import path
+from pwd import getpwnam
+
+
+PATH: str = path.dirname(path.abspath(__file__))
+PRELOAD: str = path.join(PATH, "..", "data", "original_team")
+GAME_MODULES: tuple[str, ...] = ("GoLLib", "GoLEngine", "GoLGoals", "GoLStage", "GoLLog")
+SAFE_USER: str = "player"
+TIMEOUT: float = 600
+MAX_FILE_SIZE: int = 1 << 30
+READ_SIZE: int = 1 << 16
+
+
+class Result(typing.NamedTuple):
+    """
+    The answer of the pool for a submission
+
+    Attributes:
+        code (int): the exit code of the game, negative for the signal that killed it
+        output (str): what the game printed, stdout and stderr
+        seconds (float): the time from the fork of the child to its end
+    """
+    code: int
+    output: str
+    seconds: float
+
+
+def warmUp(preload: str) -> None:
+    """
+    Import the prelude of ModulePlayer and the modules of the game from `preload`
+    """
+    sys.path.insert(0, path.abspath(preload))
+    for module in (*GAME_MODULES, *importlib.import_module("GoLLib").PRELUDE):
+        importlib.import_module(module)
+
+
+def enterSandbox(team: str, preload: str) -> None:
+    """
+    Turn the forked child into the sandbox of the team, ModuleGame and ModulePlayer are then imported from `team`
+    """
+    os.setsid()
+    os.umask(0o022)
+    resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+    resource.setrlimit(resource.RLIMIT_FSIZE, (MAX_FILE_SIZE, MAX_FILE_SIZE))
+    if os.getuid() == 0:
+        os.setgroups([])
+        os.setgid(getpwnam(SAFE_USER).pw_gid)
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, signal.SIG_DFL)
+
+    os.chdir(team)
+    sys.path = [team] + [p for p in sys.path[1:] if p != path.abspath(preload)]
+
+
+def runChild(team: str, args: list[str], preload: str, output: int) -> typing.NoReturn:
+    """
+    The forked child: play the submission with its output sent to `output`, and never return to the worker
+    """
+    code: int = 1
+    try:
+        os.dup2(output, 1)
+        os.dup2(output, 2)
+        null: int = os.open(os.devnull, os.O_RDONLY)
+        os.dup2(null, 0)
+        # The socket of the pool and the connection of the request
+        os.closerange(3, os.sysconf("SC_OPEN_MAX"))
+        enterSandbox(team, preload)
+        sys.argv = [path.join(team, "ModuleGame.py"), *args]
+        runpy.run_path(sys.argv[0], run_name="__main__")
+        code = 0
+    except SystemExit as e:
+        code = e.code if isinstance(e.code, int) else int(e.code is not None)
+    except BaseException:
+        traceback.print_exc()
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os._exit(code)
+
+
+def playSubmission(team: str, args: list[str], timeout: float, preload: str) -> Result:
+    """
+    Fork a child to play the submission, and collect its output until it ends or its process group is killed
+    """
+    start: float = time.perf_counter()
+    read_fd, write_fd = os.pipe()
+    pid: int = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        runChild(team, args, preload, write_fd)
+    os.close(write_fd)
+
+    chunks: list[bytes] = []
+    deadline: float = start + timeout
+    with open(read_fd, "rb", buffering=0) as reader:
+        while True:
+            ready, _, _ = select.select([reader], [], [], max(0, deadline - time.perf_counter()))
+            if not ready:
+                # The workers of the parallel engine are in the group of the child
+                os.killpg(pid, signal.SIGKILL)
+                chunks.append(f"\nTimeout after {timeout:g} s\n".encode("iso8859"))
+                break
+            chunk: bytes = reader.read(READ_SIZE)
+            if not chunk:
+                break
+            chunks.append(chunk)
+
+    _, status = os.waitpid(pid, 0)
+    return Result(os.waitstatus_to_exitcode(status), b"".join(chunks).decode("iso8859"), time.perf_counter() - start)
+
+
+def serveWorker(listener: multiprocessing.connection.Listener, preload: str) -> None:
+    """
+    A worker of the pool, plays the submissions it accepts one at a time
+    """
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    while True:
+        with listener.accept() as conn:
+            result: Result
+            try:
+                request: dict[str, typing.Any] = json.loads(conn.recv_bytes())
+                result = playSubmission(path.abspath(request["team"]), [str(arg) for arg in request["args"]], float(request.get("timeout", TIMEOUT)), preload)
+            except Exception as e:
+                result = Result(-1, f"Invalid request: {e!r}\n", 0)
+            conn.send_bytes(json.dumps(result._asdict()).encode("utf-8"))
+
+
+def serve(address: str, workers: int = 1, preload: str = PRELOAD) -> None:
+    """
+    Warm up, then keep `workers` workers accepting the submissions on the unix socket `address`
+    """
+    warmUp(preload)
+    if path.exists(address):
+        os.remove(address)
+
+    context: typing.Any = multiprocessing.get_context("fork")
+    with multiprocessing.connection.Listener(address, family="AF_UNIX") as listener:
+        os.chmod(address, 0o600)
+        processes: list[typing.Any] = []
+        signal.signal(signal.SIGTERM, lambda *args: sys.exit(0))
+        try:
+            while True:
+                processes = [process for process in processes if process.is_alive()]
+                while len(processes) < workers:
+                    # Not daemons, the children would inherit it and could not start the processes of the game
+                    processes.append(context.Process(target=serveWorker, args=(listener, preload)))
+                    processes[-1].start()
+                multiprocessing.connection.wait([process.sentinel for process in processes])
+        finally:
+            for process in processes:
+                process.terminate()
+
+
+def play(address: str, team: str, args: list[str], timeout: float = TIMEOUT) -> Result:
+    """
+    Play a submission in the pool listening on `address`
+    """
+    with multiprocessing.connection.Client(address, family="AF_UNIX") as conn:
+        conn.send_bytes(json.dumps({"team": team, "args": args, "timeout": timeout}).encode("utf-8"))
+        return Result(**json.loads(conn.recv_bytes()))
+
+
+if __name__ == "__main__":
+    options: dict[str, str] = dict(arg[2:].partition("=")[::2] for arg in sys.argv[3:] if arg.startswith("--"))
+    if sys.argv[1] == "serve":
+        serve(sys.argv[2], int(options.get("workers") or 1), options.get("preload") or PRELOAD)
+    else:
+        res: Result = play(sys.argv[2], sys.argv[3], sys.argv[4:])
+        print(res.output, end="")
+        sys.exit(res.code)
@@ -4,15 +4,21 @@ The main file of the game
 
 
 import sys
-from os import path, makedirs, remove
+from os import path, makedirs, remove, environ
 from shutil import copy, copytree, rmtree
-from subprocess import Popen, PIPE, STDOUT
-from enum import Enum
+from subprocess import Popen, PIPE, STDOUT, TimeoutExpired, run
 from random import randint, random
 from collections import defaultdict
+import pool
 
 
 PATH: str = path.dirname(path.abspath(__file__))
+# The socket of the sandbox pool (see pool.py), the submissions are played in a new container each when it is not set
+POOL_SOCKET: str = environ.get("POOL_SOCKET", "")
+# Set to .in, .rle or .gol to play random stages in that format instead of the stages of the original team
+GENERATE_STAGES: str = environ.get("GENERATE_STAGES", "")
+# The cpus given to each game, with more than one the generations are stepped by the parallel engine
+GAME_CPUS: int = int(environ.get("GAME_CPUS", "1"))
 BANNED_WORDS: list[str] = [
     'breakpoint',
     'compile'
@@ -74,7 +80,8 @@ def initEnvironement(team_id: int, root: str) -> None:
     with open(src, "r", encoding="iso8859") as file:
         lines = file.readlines()
     with open(f"{dst}/ModulePlayer.py", "w", encoding="iso8859") as file:
-        file.write("import GoLLib, types, typing, collections, functools, itertools, dataclasses, enum, time, random, math, cmath, heapq, bisect, array, decimal, fractions, statistics, numpy, sympy, networkx, sortedcontainers\n")
+        # The modules of GoLLib.PRELUDE are bound to lazy proxies, imported when the player first uses them
+        file.write("import GoLLib; GoLLib.bindPrelude(globals())\n")
         for line in lines:
             if sanatizeLine(line):
                 continue
@@ -86,53 +93,43 @@ def initEnvironement(team_id: int, root: str) -> None:
         pass
 
 
-class Stages(Enum):
+def generateStage(dst: str, stages: tuple[str, ...], extension: str = ".in") -> None:
     """
+    Write a random stage for each goal, the format is chosen by `extension`: `.in`, `.rle` or `.gol`
     """
-    MORE = 1
-    LESS = 2
-    ODD = 3
-    EVEN = 4
-    BORDER = 5
-    FIX = 6
-    CLING = 7
+    # The goals are the ones of the game, the game needs numpy so only import it when generating
+    sys.path.insert(0, path.join(path.dirname(dst), "..", "..", "original_team"))
+    import GoLLib
+    import GoLStage
 
-
-def generateStage(dst: str, stages: tuple[str, ...]) -> None:
-    """
-    """
-    return
     makedirs(dst, mode=755, exist_ok=True)
 
     for stage_id in map(int, stages):
-        stage: Stages = Stages(stage_id)
+        stage: GoLLib.Goal = GoLLib.Goal(stage_id)
         width: int = 500
         height: int = 500
         gen: int = 100
 
         grid: list[list[int]] = [[random() < 0.3 for _ in range(width)] for _ in range(height)]
-        res = ""
-        for row in grid:
-            for cell in row:
-                res += "O" if cell else "."
-            res += "\n"
+        GoLStage.writeStage(f"{dst}/{stage.name.lower()}{extension}", width, height, stage.value, gen, grid)
 
-        with open(f"{dst}/{stage.name.lower()}.in", "w", encoding="iso8859") as file:
-            file.write(f"Dimension: {width} {height}\n")
-            file.write(f"Goal: {stage.value}\n")
-            file.write(f"Generation: {gen}\n")
-            file.write(res)
 
-
-def callInsideDocker(team_id: int, root: str, stages: tuple[str, ...]) -> None:
+def callInsideDocker(team_id: int, root: str, stages: tuple[str, ...], cpus: int = 1, timeout: float = pool.TIMEOUT) -> None:
     """
+    With more than one cpu, the game steps the generations with one worker process per cpu
+
+    The container is killed after `timeout` seconds, the output is written to the team log even when the game fails,
+    the failure is raised after it
     """
     dst: str = f"{root}/teams/{team_id}"
     if not path.isdir(dst):
         raise NotADirectoryError(dst)
 
+    name: str = f"game-{team_id}"
+    options: str = f"--engine=parallel --workers={cpus}" if cpus > 1 else ""
+    shm_size: str = "--shm-size=1g " if cpus > 1 else ""
     process = Popen(
-        f"docker run --rm --cap-drop ALL --cap-add SETUID --security-opt no-new-privileges --network none --cpus=1 -v {dst}:/app -e STAGES='{' '.join(stages)}' secure-python-runner",
+        f"docker run --rm --name {name} --cap-drop ALL --cap-add SETUID --security-opt no-new-privileges --network none --cpus={cpus} {shm_size}-v {dst}:/app -e STAGES='{' '.join(stages)}' -e OPTIONS='{options}' secure-python-runner",
         shell=True,
         stdout=PIPE,
         stderr=STDOUT,
@@ -140,13 +137,44 @@ def callInsideDocker(team_id: int, root: str, stages: tuple[str, ...]) -> None:
         errors="ignore"
     )
 
+    timed_out: bool = False
     try:
+        output, _ = process.communicate(timeout=timeout)
+    except TimeoutExpired:
+        # Killing the docker client would leave the container running
+        run(["docker", "kill", name], capture_output=True)
         output, _ = process.communicate()
-        with open(f"{root}/logs/{team_id}.log", "w", encoding="iso8859") as log_file:
-            log_file.write(output)
+        output += f"\nTimeout after {timeout:g} s\n"
+        timed_out = True
     except Exception as e:
         process.kill()
         raise e
+    with open(f"{root}/logs/{team_id}.log", "w", encoding="iso8859") as log_file:
+        log_file.write(output)
+
+    if timed_out:
+        raise TimeoutError(f"The game of the team {team_id} was killed after {timeout:g} s")
+
+
+def callInsidePool(team_id: int, root: str, stages: tuple[str, ...], cpus: int = 1, timeout: float = pool.TIMEOUT) -> None:
+    """
+    Play the submission in a warm worker of the sandbox pool listening on POOL_SOCKET, instead of a new container
+
+    The output is written to the team log even when the game fails, the failure is raised after it
+    """
+    dst: str = f"{root}/teams/{team_id}"
+    if not path.isdir(dst):
+        raise NotADirectoryError(dst)
+
+    options: list[str] = ["--engine=parallel", f"--workers={cpus}"] if cpus > 1 else []
+    result: pool.Result = pool.play(POOL_SOCKET, dst, [*options, *stages], timeout)
+    with open(f"{root}/logs/{team_id}.log", "w", encoding="iso8859") as log_file:
+        log_file.write(result.output)
+
+    if result.seconds >= timeout:
+        raise TimeoutError(f"The game of the team {team_id} was killed after {timeout:g} s")
+    if result.code != 0:
+        raise ChildProcessError(f"The game of the team {team_id} ended with the code {result.code}")
 
 
 def closeEnvironement(team_id: int, root: str) -> None:
@@ -160,11 +188,14 @@ def closeEnvironement(team_id: int, root: str) -> None:
 
     makedirs(dst, mode=755, exist_ok=True)
     copy(f"{src}/ModulePlayer.py", dst + ".py")
+    # The stage logs, all.log and perf.json
     copytree(f"{src}/logs", dst, dirs_exist_ok=True)
 
     result: str = "["
-    with open(f"{dst}/logs/all.log", "r", encoding="iso8859") as file:
+    with open(f"{dst}/all.log", "r", encoding="iso8859") as file:
         for line in file.readlines():
+            if not line.startswith("Score "):
+                continue
             _, stage_name, score, *_ = line.split()
             stage_name = stage_name[:-1]
             result += "{" + f"stage_name: {stage_name}:, score: {score}" + "},"
@@ -186,8 +217,12 @@ def main(team_id: int, root: str, *stages: str) -> None:
         root (str): The path to the root folder
     """
     initEnvironement(team_id, root)
-    generateStage(f"{root}/teams/{team_id}/stages", stages)
-    callInsideDocker(team_id, root, stages)
+    if GENERATE_STAGES:
+        generateStage(f"{root}/teams/{team_id}/stages", stages, GENERATE_STAGES)
+    if POOL_SOCKET:
+        callInsidePool(team_id, root, stages, GAME_CPUS)
+    else:
+        callInsideDocker(team_id, root, stages, GAME_CPUS)
     closeEnvironement(team_id, root)
 
 
@@ -0,0 +1,18 @@
+"""
+The files of the game on the path, with the ModulePlayer of the original team as runner.py writes it for a team
+"""
+
+
+import sys
+import types
+from os import path
+
+ORIGINAL_TEAM: str = path.join(path.dirname(path.abspath(__file__)), "..", "data", "original_team")
+sys.path.insert(0, ORIGINAL_TEAM)
+
+# ModuleGame imports ModulePlayer as the player user, who can not read every checkout
+player: types.ModuleType = types.ModuleType("ModulePlayer")
+player.__file__ = path.join(ORIGINAL_TEAM, "ModulePlayer.py")
+with open(player.__file__, "r", encoding="iso8859") as file:
+    exec("import GoLLib; GoLLib.bindPrelude(globals())\n" + file.read(), player.__dict__)
+sys.modules["ModulePlayer"] = player
@@ -0,0 +1,87 @@
+"""
+The time budget against a player that catches the timeout: the call must end all the same
+
+Usage: python3 -m pytest back/src/tests
+"""
+
+
+import time
+import signal
+import typing
+import multiprocessing
+import multiprocessing.connection
+from os import path
+import pytest
+import numpy
+import GoLLib
+import GoLLog
+
+try:
+    import ModuleGame
+except KeyError:
+    pytest.skip("ModuleGame needs the player user", allow_module_level=True)
+
+
+def catchException(stage: GoLLib.StageData, played: list[GoLLib.Coord]) -> None:
+    try:
+        while True:
+            pass
+    except Exception:
+        while True:
+            pass
+
+
+def catchBaseException(stage: GoLLib.StageData, played: list[GoLLib.Coord]) -> None:
+    try:
+        while True:
+            pass
+    except BaseException:
+        while True:
+            pass
+
+
+def callOnce(play: typing.Callable[[GoLLib.StageData, list[GoLLib.Coord]], None], log_file: str, conn: multiprocessing.connection.Connection) -> None:
+    """
+    One turn of `play` as callPlayer gives it, the number of timeouts is sent to `conn` when the call ends
+    """
+    ModuleGame.ModulePlayer.play = play
+    stage: GoLLib.StageData = GoLLib.StageData(40, 30, GoLLib.Goal.MORE, 10, numpy.zeros((30, 40), dtype=bool))
+    count_neighbor, _ = ModuleGame.ENGINES[ModuleGame.Engine.NUMPY]
+    budget: ModuleGame.Budget = ModuleGame.Budget(0.05, 0.1, 1.0, 0.2)
+    signal.pthread_sigmask(signal.SIG_BLOCK, ModuleGame.TIMER_SIGNALS)
+    with GoLLog.LogWriter(log_file, 40, 30) as log:
+        ModuleGame.callPlayer(stage, count_neighbor(stage), log, budget, ModuleGame.Perf())
+    conn.send(budget.timeouts)
+
+
+def playForked(play: typing.Callable[[GoLLib.StageData, list[GoLLib.Coord]], None], log_file: str) -> tuple[int, int | None, float]:
+    """
+    Run callOnce in a forked process, the timers end the whole process
+
+    Returns:
+        tuple[int, int | None, float]: the exit code of the process, the timeouts when the call ended, and the wall
+        seconds of the process
+    """
+    start: float = time.perf_counter()
+    receiver, sender = multiprocessing.Pipe(False)
+    process = multiprocessing.get_context("fork").Process(target=callOnce, args=(play, log_file, sender))
+    process.start()
+    process.join(10)
+    if process.is_alive():
+        process.kill()
+        process.join()
+        pytest.fail("The player was never stopped")
+    return process.exitcode, receiver.recv() if receiver.poll() else None, time.perf_counter() - start
+
+
+def test_catch_exception(tmp_path: str) -> None:
+    # BudgetExceeded is not an Exception, the call ends at the first timeout
+    code, timeouts, _ = playForked(catchException, path.join(str(tmp_path), "more.log"))
+    assert code == 0 and timeouts == 1
+
+
+def test_catch_base_exception(tmp_path: str) -> None:
+    # The timers end the game once the grace seconds are over
+    code, timeouts, seconds = playForked(catchBaseException, path.join(str(tmp_path), "more.log"))
+    assert code in (-signal.SIGPROF, -signal.SIGALRM) and timeouts is None
+    assert seconds < 2
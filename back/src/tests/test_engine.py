@@ -0,0 +1,149 @@
+"""
+The numpy engine against the reference engine of ModuleGame, generation by generation
+
+Usage: python3 -m pytest back/src/tests
+"""
+
+
+import glob
+import signal
+from os import path, kill
+import pytest
+import numpy
+import GoLLib
+import GoLEngine
+import GoLStage
+
+try:
+    import ModuleGame
+except KeyError:
+    pytest.skip("ModuleGame needs the player user", allow_module_level=True)
+
+
+GENERATIONS: int = 12
+# The reference engine takes about two seconds per generation of a 500x500 stage
+STAGE_GENERATIONS: int = 3
+STAGES: list[str] = sorted(glob.glob(path.join(path.dirname(GoLEngine.__file__), "stages", "*.in")))
+BLINKER: numpy.ndarray = numpy.array([[1, 1, 1]], dtype=bool)
+GLIDER: numpy.ndarray = numpy.array([[0, 1, 0], [0, 0, 1], [1, 1, 1]], dtype=bool)
+
+
+def place(width: int, height: int, pattern: numpy.ndarray, h: int, w: int) -> numpy.ndarray:
+    """
+    A dead (height, width) grid with `pattern` at row `h` and column `w`
+    """
+    cells: numpy.ndarray = numpy.zeros((height, width), dtype=bool)
+    cells[h:h + pattern.shape[0], w:w + pattern.shape[1]] = pattern
+    return cells
+
+
+def referenceRun(cells: numpy.ndarray, generations: int) -> list[numpy.ndarray]:
+    """
+    Every generation of `cells` computed by the reference engine, with its neighbor counts kept up to date
+    """
+    height, width = cells.shape
+    stage: GoLLib.StageData = GoLLib.StageData(width, height, GoLLib.Goal.MORE, generations, cells.flatten().tolist())
+    neighbor: list[list[int]] = ModuleGame.countNeighbor(stage)
+    res: list[numpy.ndarray] = []
+    for _ in range(generations):
+        assert numpy.array_equal(numpy.array(neighbor), GoLEngine.countNeighbors(numpy.asarray(stage.grid)))
+        ModuleGame.actualizeStage(stage, neighbor)
+        res.append(numpy.asarray(stage.grid).copy())
+    return res
+
+
+def numpyRun(cells: numpy.ndarray, generations: int) -> list[numpy.ndarray]:
+    """
+    Every generation of `cells` computed by GoLEngine
+    """
+    res: list[numpy.ndarray] = []
+    for _ in range(generations):
+        cells = GoLEngine.nextGeneration(cells, GoLEngine.countNeighbors(cells))
+        res.append(cells)
+    return res
+
+
+def checkSame(cells: numpy.ndarray, generations: int = GENERATIONS) -> None:
+    """
+    Check that both engines give the same grid at every generation
+    """
+    for gen, (expected, got) in enumerate(zip(referenceRun(cells, generations), numpyRun(cells, generations)), 1):
+        assert numpy.array_equal(expected, got), f"generation {gen} differs"
+
+
+@pytest.mark.parametrize("width,height,density", [(3, 3, 0.5), (7, 5, 0.3), (5, 9, 0.5), (32, 17, 0.3), (64, 64, 0.2)])
+def test_random(width: int, height: int, density: float) -> None:
+    rng: numpy.random.Generator = numpy.random.default_rng(width * 1000 + height)
+    for _ in range(4):
+        checkSame(rng.random((height, width)) < density)
+
+
+@pytest.mark.parametrize("h,w", [(0, 0), (0, 3), (3, 0), (7, 7), (9, 3), (3, 7), (4, 4)])
+def test_blinker(h: int, w: int) -> None:
+    checkSame(place(10, 10, BLINKER, h, w))
+    checkSame(place(10, 10, BLINKER.T, w, h))
+
+
+@pytest.mark.parametrize("h,w", [(0, 0), (0, 7), (7, 0), (7, 7), (3, 3)])
+def test_glider(h: int, w: int) -> None:
+    # The gliders run into the edges and break there
+    for pattern in (GLIDER, GLIDER[::-1], GLIDER[:, ::-1], GLIDER.T):
+        checkSame(place(10, 10, pattern, h, w), 30)
+
+
+@pytest.mark.parametrize("file", STAGES, ids=path.basename)
+def test_stage(file: str) -> None:
+    checkSame(GoLStage.readStage(file)[4], STAGE_GENERATIONS)
+
+
+@pytest.mark.parametrize("width", [1, 3, 63, 64, 65, 130])
+def test_packed(width: int) -> None:
+    # The words of a row carry their edge bits into each other, and the last word of a row is masked
+    rng: numpy.random.Generator = numpy.random.default_rng(width)
+    cells: numpy.ndarray = rng.random((11, width)) < 0.35
+    packed: GoLEngine.PackedCells = GoLEngine.PackedCells(cells)
+    for gen, expected in enumerate(numpyRun(cells, GENERATIONS), 1):
+        packed.step()
+        assert numpy.array_equal(numpy.asarray(packed), expected), f"generation {gen} differs"
+
+
+def test_blinker_period() -> None:
+    cells: numpy.ndarray = place(5, 5, BLINKER, 2, 1)
+    run: list[numpy.ndarray] = numpyRun(cells, 2)
+    assert numpy.array_equal(run[0], place(5, 5, BLINKER.T, 1, 2))
+    assert numpy.array_equal(run[1], cells)
+
+
+@pytest.mark.parametrize("engine", [ModuleGame.Engine.REFERENCE, ModuleGame.Engine.NUMPY, ModuleGame.Engine.PACKED, ModuleGame.Engine.TILED])
+def test_apply_moves(engine: ModuleGame.Engine) -> None:
+    # A cell played an odd number of times is swapped, the neighbor counts follow
+    rng: numpy.random.Generator = numpy.random.default_rng(len(engine))
+    for moves in (1, 3, 40, 2000):
+        cells: numpy.ndarray = rng.random((23, 37)) < 0.3
+        played: numpy.ndarray = rng.integers(0, cells.size, size=moves)
+        expected: numpy.ndarray = cells ^ (numpy.bincount(played, minlength=cells.size) % 2 == 1).reshape(cells.shape)
+        stage: GoLLib.StageData = GoLLib.StageData(37, 23, GoLLib.Goal.MORE, 10, cells)
+        stage.moves = moves
+        count_neighbor, actualize_stage = ModuleGame.ENGINES[engine]
+        neighbor: ModuleGame.Neighbor = count_neighbor(stage)
+        ModuleGame.applyMoves(stage, neighbor, played)
+        assert stage.moves == 0
+        assert numpy.array_equal(numpy.asarray(ModuleGame.getCells(stage)), expected)
+        actualize_stage(stage, neighbor)
+        assert numpy.array_equal(numpy.asarray(ModuleGame.getCells(stage)), numpyRun(expected, 1)[0])
+
+
+@pytest.mark.parametrize("sig", [signal.SIGKILL, signal.SIGSTOP])
+def test_parallel_fallback(sig: signal.Signals) -> None:
+    # A worker killed or stopped between two steps, the game goes on with the numpy engine
+    cells: numpy.ndarray = numpy.random.default_rng(int(sig)).random((40, 30)) < 0.3
+    expected: list[numpy.ndarray] = numpyRun(cells, 6)
+    parallel: GoLEngine.ParallelCells = GoLEngine.ParallelCells(cells, 3, timeout=0.5)
+    try:
+        for gen in range(6):
+            if gen == 3:
+                kill(parallel._ParallelCells__workers[1].pid, sig)
+            parallel.step()
+            assert numpy.array_equal(parallel.cells, expected[gen]), f"generation {gen + 1} differs"
+    finally:
+        parallel.close()
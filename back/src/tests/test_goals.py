@@ -0,0 +1,159 @@
+"""
+The scores of GoLGoals against the scorers of the first version of the game, copied here, for every goal
+
+The first scorers read the board column by column, only looked at the windows of the top-left square, and divided
+CLING by the maximum of FIX: the scores must stay the same, quirks included
+
+Usage: python3 -m pytest back/src/tests
+"""
+
+
+import glob
+from os import path
+import pytest
+import numpy
+import GoLLib
+import GoLGoals
+import GoLEngine
+import GoLStage
+
+
+STAGES: list[str] = sorted(glob.glob(path.join(path.dirname(GoLGoals.__file__), "stages", "*.in")))
+# The first pattern scorers take seconds on a 500x500 board, they only score the stages of their goal
+SLOW_GOALS: tuple[GoLLib.Goal, ...] = (GoLLib.Goal.FIX, GoLLib.Goal.CLING)
+
+
+def oldBorder(width: int, height: int, grid: list[bool]) -> float:
+    maximum: int = 0
+    for i in range(5):
+        maximum += (5 - i) * 2 * ((width - 2 * i) + (height - 2 * i) - 2)
+    percent: float = 0
+    for i in range(5):
+        for w in range(i, width - i):
+            percent += (5 - i) * grid[w + i * width]
+            percent += (5 - i) * grid[w + (height - i - 1) * width]
+        for h in range(i + 1, height - i - 1):
+            percent += (5 - i) * grid[i + h * width]
+            percent += (5 - i) * grid[width - i - 1 + h * width]
+    percent /= maximum
+    return percent
+
+
+def oldMaximumFix(width: int, height: int) -> int:
+    return (1 + (width - 4) // 3 + ((width - 4) % 3 == 2)) * (1 + (height - 4) // 3 + ((height - 4) % 3 == 2))
+
+
+def oldPatterns(width: int, height: int, grid: list[bool], patterns: list[numpy.ndarray]) -> float:
+    data_array = numpy.zeros((height + 2, width + 2), dtype=bool)
+    data_array[1:-1, 1:-1] = numpy.array([grid[w + h * width] for w in range(width) for h in range(height)]).reshape((height, width))
+    data_rows, data_cols = data_array.shape
+    patern_rows, patern_cols = patterns[0].shape
+    percent: float = 0
+    for i in range(data_rows - patern_rows + 1):
+        for j in range(data_cols - patern_cols + 1):
+            if any(numpy.array_equal(data_array[j:j + patern_cols, i:i + patern_rows], pattern) for pattern in patterns):
+                percent += 1
+    percent /= oldMaximumFix(width, height)
+    return percent
+
+
+OLD_FIX: numpy.ndarray = numpy.zeros((4, 4), dtype=bool)
+OLD_FIX[1:-1, 1:-1] = True
+OLD_CLING: list[numpy.ndarray] = [numpy.zeros((5, 5), dtype=bool), numpy.zeros((5, 5), dtype=bool)]
+OLD_CLING[0][2, 1:4] = True
+OLD_CLING[1][1:4, 2] = True
+
+
+def oldScore(goal: GoLLib.Goal, width: int, height: int, grid: list[bool]) -> int:
+    """
+    calculateResult of the first version of ModuleGame, on the grid as a list of `w + h * width`
+    """
+    percent: float
+    match goal:
+        case GoLLib.Goal.MORE | GoLLib.Goal.LESS:
+            percent = sum(grid) if (goal == GoLLib.Goal.MORE) else (width * height - sum(grid))
+            percent /= (width * height)
+        case GoLLib.Goal.ODD | GoLLib.Goal.EVEN:
+            percent = sum(v for i, v in enumerate(grid) if ((i % 2) == (goal == GoLLib.Goal.ODD)))
+            percent *= 2
+            percent /= (width * height)
+        case GoLLib.Goal.BORDER: percent = oldBorder(width, height, grid)
+        case GoLLib.Goal.FIX:    percent = oldPatterns(width, height, grid, [OLD_FIX])
+        case GoLLib.Goal.CLING:  percent = oldPatterns(width, height, grid, OLD_CLING)
+        case GoLLib.Goal.YOU:    percent = 0
+    return round(percent * 1_000_000)
+
+
+def randomBoard(rng: numpy.random.Generator, width: int, height: int) -> numpy.ndarray:
+    """
+    A sparse random board with blocks and blinkers planted in it, so that FIX and CLING have matches
+    """
+    cells: numpy.ndarray = rng.random((height, width)) < rng.choice([0.05, 0.2, 0.5])
+    for _ in range(rng.integers(0, 8)):
+        h, w = int(rng.integers(0, height - 1)), int(rng.integers(0, width - 1))
+        cells[h:h + 2, w:w + 2] = True
+    for _ in range(rng.integers(0, 8)):
+        h, w = int(rng.integers(0, height - 2)), int(rng.integers(0, width - 2))
+        if rng.random() < 0.5:
+            cells[h, w:w + 3] = True
+        else:
+            cells[h:h + 3, w] = True
+    return cells
+
+
+@pytest.mark.parametrize("goal", list(GoLLib.Goal))
+def test_random(goal: GoLLib.Goal) -> None:
+    rng: numpy.random.Generator = numpy.random.default_rng(int(goal))
+    for _ in range(60):
+        width, height = int(rng.integers(5, 41)), int(rng.integers(5, 41))
+        cells: numpy.ndarray = randomBoard(rng, width, height)
+        assert GoLGoals.scoreCells(goal, cells) == oldScore(goal, width, height, cells.flatten().tolist()), (width, height)
+
+
+@pytest.mark.parametrize("goal", [GoLLib.Goal.FIX, GoLLib.Goal.CLING])
+def test_square(goal: GoLLib.Goal) -> None:
+    rng: numpy.random.Generator = numpy.random.default_rng(100 + int(goal))
+    for size in (5, 6, 7, 13, 64, 65):
+        cells: numpy.ndarray = randomBoard(rng, size, size)
+        assert GoLGoals.scoreCells(goal, cells) == oldScore(goal, size, size, cells.flatten().tolist()), size
+
+
+@pytest.mark.parametrize("file", STAGES, ids=path.basename)
+def test_stage(file: str) -> None:
+    # The shipped stage as it starts, then after 20 generations, when blocks and blinkers have formed
+    width, height, goal, _, cells = GoLStage.readStage(file)
+    later: numpy.ndarray = cells
+    for _ in range(20):
+        later = GoLEngine.nextGeneration(later, GoLEngine.countNeighbors(later))
+    for board in (cells, later):
+        for scored in GoLLib.Goal:
+            if scored in SLOW_GOALS and scored != goal:
+                continue
+            assert GoLGoals.scoreCells(scored, board) == oldScore(scored, width, height, board.flatten().tolist()), scored.name
+
+
+@pytest.mark.parametrize("width,height", [(4, 4), (63, 9), (64, 10), (65, 11), (130, 7), (200, 33)])
+def test_count_pattern(width: int, height: int) -> None:
+    # The packed count against the count of every window, on widths around the 64 cells of a word
+    rng: numpy.random.Generator = numpy.random.default_rng(width * height)
+    block: numpy.ndarray = numpy.pad(numpy.ones((2, 2), dtype=bool), 1)
+    blinker: numpy.ndarray = numpy.pad(numpy.ones((1, 3), dtype=bool), ((2, 2), (1, 1)))
+    glider: numpy.ndarray = numpy.array([[0, 1, 0], [0, 0, 1], [1, 1, 1]], dtype=bool)
+    for density in (0.1, 0.5, 0.9):
+        board: numpy.ndarray = rng.random((height, width)) < density
+        # A pattern with dead cells on its right must not match past the right edge
+        board[1:4, -4:] = False
+        board[2, -3:] = True
+        for pattern in (block, blinker, blinker.T, glider, glider[:1]):
+            expected: int = 0
+            if pattern.shape[0] <= height and pattern.shape[1] <= width:
+                windows: numpy.ndarray = numpy.lib.stride_tricks.sliding_window_view(board, pattern.shape)
+                expected = int((windows == pattern).all(axis=(2, 3)).sum())
+            assert GoLEngine.countPattern(board, pattern) == expected
+
+
+def test_packed() -> None:
+    rng: numpy.random.Generator = numpy.random.default_rng(0)
+    cells: numpy.ndarray = randomBoard(rng, 70, 37)
+    for goal in GoLLib.Goal:
+        assert GoLGoals.scoreCells(goal, numpy.asarray(GoLEngine.PackedCells(cells))) == GoLGoals.scoreCells(goal, cells)
@@ -0,0 +1,74 @@
+"""
+The replay verifier against logs played with the numpy engine, as ModuleGame plays a stage
+
+Usage: python3 -m pytest back/src/tests
+"""
+
+
+from os import path
+import pytest
+import numpy
+import GoLLib
+import GoLLog
+import GoLGoals
+import GoLStage
+import GoLEngine
+import GoLReplay
+
+
+WIDTH: int = 70
+HEIGHT: int = 40
+LAST_GEN: int = 30
+
+
+def playGame(logs_dir: str, goal: GoLLib.Goal, log_format: GoLLog.LogFormat, wrong_gen: int = -1) -> int:
+    """
+    Play random moves on a random stage and log them in `<goal>.log` and `all.log`, the score of `wrong_gen` is
+    logged off by one
+
+    Returns:
+        int: the score of the last generation
+    """
+    rng: numpy.random.Generator = numpy.random.default_rng(int(goal))
+    cells: numpy.ndarray = rng.random((HEIGHT, WIDTH)) < 0.3
+    file: str = path.join(logs_dir, f"{goal.name.lower()}.log")
+    with open(file, "w", encoding="iso8859") as log_file:
+        log_file.write(GoLStage.formatText(WIDTH, HEIGHT, goal.value, LAST_GEN, cells) + GoLStage.SEPARATOR)
+
+    stage: GoLLib.StageData = GoLLib.StageData(WIDTH, HEIGHT, goal, LAST_GEN, cells)
+    score: int = 0
+    with GoLLog.LogWriter(file, WIDTH, HEIGHT, log_format, 1) as log:
+        while stage.gen < LAST_GEN:
+            cells = GoLEngine.nextGeneration(cells, GoLEngine.countNeighbors(cells))
+            moves: numpy.ndarray = rng.integers(0, cells.size, size=int(rng.integers(0, stage.moves + 1)))
+            cells = cells ^ (numpy.bincount(moves, minlength=cells.size) % 2 == 1).reshape(cells.shape)
+            score = GoLGoals.scoreCells(goal, cells)
+            log.frame(stage.gen, moves)
+            log.line(f"Score: {stage.gen} {score + (stage.gen == wrong_gen)}")
+            log.snapshot(stage.gen, cells)
+            stage.moves -= len(moves)
+            stage.moves = GoLGoals.nextMoves(stage)
+            stage.gen += 1
+
+    with open(path.join(logs_dir, "all.log"), "w", encoding="iso8859") as log_file:
+        log_file.write(f"Score {goal.name.lower()}: {score}\nTotal: {score}\n")
+    return score
+
+
+@pytest.mark.parametrize("log_format", list(GoLLog.LogFormat))
+@pytest.mark.parametrize("goal", [GoLLib.Goal.MORE, GoLLib.Goal.BORDER, GoLLib.Goal.CLING])
+def test_replay(tmp_path: str, goal: GoLLib.Goal, log_format: GoLLog.LogFormat) -> None:
+    score: int = playGame(str(tmp_path), goal, log_format)
+    for final in (False, True):
+        replay: GoLReplay.Replay = GoLReplay.verify(str(tmp_path), final=final, workers=1)[0]
+        assert replay.errors == []
+        assert replay.score == score
+
+
+@pytest.mark.parametrize("log_format", list(GoLLog.LogFormat))
+def test_wrong_score(tmp_path: str, log_format: GoLLog.LogFormat) -> None:
+    playGame(str(tmp_path), GoLLib.Goal.MORE, log_format, 12)
+    errors: list[str] = GoLReplay.verify(str(tmp_path), workers=1)[0].errors
+    assert len(errors) == 1 and errors[0].startswith("score 12:")
+    # --final does not read the scores of the generations before the last one
+    assert GoLReplay.verify(str(tmp_path), final=True, workers=1)[0].errors == []
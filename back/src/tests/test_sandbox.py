@@ -0,0 +1,79 @@
+"""
+The arrays given to the player against writes through their bases: the game must score the same
+
+Usage: python3 -m pytest back/src/tests
+"""
+
+
+import typing
+import pytest
+import numpy
+import GoLLib
+
+try:
+    import ModuleGame
+except KeyError:
+    pytest.skip("ModuleGame needs the player user", allow_module_level=True)
+
+
+def tamper(res: typing.Any, value: typing.Any) -> None:
+    """
+    Write `value` in `res` and in everything its bases lead to, as a player would try
+    """
+    seen: set[int] = set()
+    while res is not None and id(res) not in seen:
+        seen.add(id(res))
+        try:
+            array: numpy.ndarray = numpy.asarray(res)
+            array.flags.writeable = True
+            array[...] = value
+        except (ValueError, TypeError):
+            pass
+        res = getattr(res, "base", None) if isinstance(res, numpy.ndarray) else getattr(res, "obj", None)
+
+
+def playOnce(engine: ModuleGame.Engine, attack: typing.Callable[[GoLLib.StageData], None]) -> tuple[int, numpy.ndarray]:
+    """
+    One turn of the player then one generation, the score and the cells after them
+    """
+    cells: numpy.ndarray = numpy.random.default_rng(7).random((30, 40)) < 0.3
+    stage: GoLLib.StageData = GoLLib.StageData(40, 30, GoLLib.Goal.MORE, 10, cells)
+    count_neighbor, actualize_stage = ModuleGame.ENGINES[engine]
+    neighbor: ModuleGame.Neighbor = count_neighbor(stage)
+    ModuleGame.shareState(stage, neighbor)
+    with ModuleGame.Guardian():
+        attack(stage)
+    actualize_stage(stage, neighbor)
+    return ModuleGame.calculateResult(stage), numpy.array(ModuleGame.getCells(stage))
+
+
+ATTACKS: dict[str, typing.Callable[[GoLLib.StageData], None]] = {
+    "view": lambda stage: tamper(stage.grid.view(), True),
+    "asarray": lambda stage: tamper(numpy.asarray(stage.grid), True),
+    "row": lambda stage: tamper(stage.grid.row(3), True),
+    "rect": lambda stage: tamper(stage.grid.rect(1, 2, 10, 10), True),
+    "alive": lambda stage: tamper(stage.grid.alive(), 0),
+    "neighbors": lambda stage: tamper(stage.neighbors(), 3),
+    "changed": lambda stage: tamper(stage.changed(), 0)
+}
+
+
+@pytest.mark.parametrize("engine", [ModuleGame.Engine.NUMPY, ModuleGame.Engine.PACKED, ModuleGame.Engine.TILED])
+@pytest.mark.parametrize("attack", ATTACKS, ids=str)
+def test_tamper(engine: ModuleGame.Engine, attack: str) -> None:
+    score, cells = playOnce(engine, lambda stage: None)
+    tampered_score, tampered_cells = playOnce(engine, ATTACKS[attack])
+    assert tampered_score == score
+    assert numpy.array_equal(tampered_cells, cells)
+
+
+def test_array_copy() -> None:
+    cells: numpy.ndarray = numpy.random.default_rng(8).random((5, 6)) < 0.5
+    grid: GoLLib.Grid = GoLLib.Grid(6, 5, cells)
+    copied: numpy.ndarray = numpy.array(grid)
+    assert copied.flags.writeable and copied.base is None and numpy.array_equal(copied, cells)
+    assert not numpy.asarray(grid).flags.writeable
+    assert numpy.array_equal(numpy.asarray(grid, dtype=numpy.int8), cells)
+    assert numpy.array(grid, copy=False) is grid.view()
+    with pytest.raises(ValueError):
+        numpy.array(grid, dtype=numpy.int8, copy=False)
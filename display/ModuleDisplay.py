@@ -10,6 +10,16 @@ from enum import IntEnum, StrEnum
 from PIL import ImageTk
 from dataclasses import dataclass, field
 from time import sleep
+import struct
+import re
+
+
+BINARY_MAGIC: bytes = b"GoLS"
+SEPARATOR: str = "---------------------------------\n"
+RLE_HEADER: re.Pattern = re.compile(r"x\s*=\s*(\d+)\s*,\s*y\s*=\s*(\d+)")
+RLE_COMMENT: re.Pattern = re.compile(r"#C\s*(Goal|Generation):\s*(\d+)", re.IGNORECASE)
+RLE_RUN: re.Pattern = re.compile(r"(\d*)([bo$])")
+ALIVE: bytes = bytes(int(i == ord('O')) for i in range(256))
 
 
 class Goal(IntEnum):
@@ -758,25 +768,94 @@ class GlobalData:
     root: "RootCanvas | None" = None
 
 
-def getStageData(src: str) -> tuple[StageData, list[str]]:
+def getBinaryStageData(data: bytes) -> tuple[StageData, list[str]]:
     """
-    Get the stage data
+    Get the stage data of a log that starts with a binary stage
+    """
+    width, height, goal, last_gen = struct.unpack_from("<IIII", data, len(BINARY_MAGIC))
+    row: int = (width + 7) // 8
+    body: int = len(BINARY_MAGIC) + 16
+    grid: list[bool] = [bool(data[body + h * row + (w >> 3)] >> (w & 7) & 1) for h in range(height) for w in range(width)]
+
+    lines: list[str] = data[body + height * row:].decode("iso8859").splitlines(keepends=True)
+    return StageData(width, height, Goal(goal), last_gen, grid), lines[1:]
+
+
+def getRLEStageData(lines: list[str]) -> tuple[StageData, list[str]]:
     """
-    lines: list[str]
-    with open(f"{DATA.path}/logs/{src}.log", "r", encoding="iso8859") as f:
-        lines = f.readlines()
+    Get the stage data of a log that starts with a RLE stage, only the live runs are written in the grid
 
-    width, height = map(int, lines[0].split(None, 3)[1:3])
-    goal: int = int(lines[1].split(None, 2)[1])
-    last_gen: int = int(lines[2].split(None, 2)[1])
+    The runs are checked like GoLStage.parseRLE does, a run past its row or past the grid is refused
+    """
+    end: int = lines.index(SEPARATOR)
+    fields: dict[str, int] = {}
+    i: int = 0
+    while lines[i].startswith("#") or not lines[i].strip():
+        comment: re.Match | None = RLE_COMMENT.match(lines[i])
+        if comment:
+            fields[comment[1].capitalize()] = int(comment[2])
+        i += 1
+
+    header: re.Match | None = RLE_HEADER.match(lines[i])
+    if header is None:
+        raise ValueError("Missing RLE header")
+    width, height = int(header[1]), int(header[2])
     grid: list[bool] = [False] * (width * height)
 
-    for h in range(height):
-        line = lines[h + 3].strip()
-        for w in range(width):
-            grid[w + h * width] = line[w] == 'O'
+    body: str = "".join("".join(lines[i + 1:end]).split()).split("!", 1)[0]
+    h: int = 0
+    w: int = 0
+    last: int = 0
+    for run in RLE_RUN.finditer(body):
+        if run.start() != last:
+            break
+        last = run.end()
+        count: int = int(run[1]) if run[1] else 1
+        if run[2] == "$":
+            h, w = h + count, 0
+            continue
+        if w + count > width or h >= height:
+            raise ValueError(f"RLE run outside of the {width}x{height} stage")
+        if run[2] == "o":
+            grid[w + h * width:w + count + h * width] = [True] * count
+        w += count
+    if last != len(body):
+        raise ValueError(f"Invalid RLE run {body[last:last + 10]!r}")
+
+    return StageData(width, height, Goal(fields["Goal"]), fields["Generation"], grid), lines[end + 1:]
 
-    return StageData(width, height, Goal(goal), last_gen, grid), lines[height + 4:]
+
+def getStageData(src: str) -> tuple[StageData, list[str]]:
+    """
+    Get the stage data
+    """
+    with open(f"{DATA.path}/logs/{src}.log", "rb") as f:
+        data: bytes = f.read()
+    if data.startswith(BINARY_MAGIC):
+        return getBinaryStageData(data)
+
+    if data[:1] in (b"#", b"x"):
+        return getRLEStageData(data.decode("iso8859").splitlines(keepends=True))
+
+    header: list[bytes] = data.split(b"\n", 3)
+    width, height = map(int, header[0].split(None, 3)[1:3])
+    goal: int = int(header[1].split(None, 2)[1])
+    last_gen: int = int(header[2].split(None, 2)[1])
+    start: int = len(header[0]) + len(header[1]) + len(header[2]) + 3
+
+    # Rows of exactly width cells and a newline are read as one block, other line endings row by row
+    end: int = start + height * (width + 1)
+    body: bytes = data[start:end]
+    if body[width::width + 1] != b"\n" * height:
+        lines: list[bytes] = data[start:].split(b"\n", height)[:height]
+        rows: list[bytes] = [line.strip() for line in lines]
+        if len(rows) < height or any(len(row) != width for row in rows):
+            raise ValueError(f"The stage of {src} does not have {height} rows of {width} cells")
+        body = b"".join(rows)
+        end = start + sum(map(len, lines)) + height
+
+    grid: list[bool] = list(map(bool, body.translate(ALIVE, b"\n")))
+    return StageData(width, height, Goal(goal), last_gen, grid), data[end:].decode("iso8859").splitlines(keepends=True)[1:]
 
 
 def parseLogsStage(src: str) -> tuple[StageData, dict[int, list[int]]]:
@@ -788,7 +867,8 @@ def parseLogsStage(src: str) -> tuple[StageData, dict[int, list[int]]]:
 
     for line in lines:
         if line.startswith("Frame:"):
-            frame, *moves = map(int, line.split()[1:])
+            # The time of the player may follow the moves
+            frame, *moves = map(int, line.partition(" Time:")[0].split()[1:])
             frames[frame] = moves
 
     return stage_data, frames